@@ -0,0 +1,177 @@
+import time
+import asyncio
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fan_out_lookup import plan_lookup, ALL_PROVIDERS
+from batch_pipeline import prefetch_rows
+from build_result import build_result
+from utm_batch import utm_for_points
+from update_status import log_status
+from providers import get_provider
+from http_session import call_with_deadline
+from lookup_settings import ASYNC_MAX_IN_FLIGHT, ELEVATION_BATCH_SIZE
+
+# asyncio enrichment engine. Hundreds of points are in flight at once and
+# each provider has its own concurrency limit, so a slow host never holds up
+# the others. The provider modules are plain blocking requests code, so each
+# provider call runs on a thread from a pool sized to the provider limits;
+# the event loop only schedules them.
+#
+#   results = asyncio.run(enrich([("Point 1", 44.05, -121.31), ...]))
+#
+# Callers without an event loop of their own (the GUI import) run it on the
+# shared loop thread with enrich_in_background.
+
+def read_chunks(points, size):
+    chunk = []
+    for point in points:
+        chunk.append(point)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def enrich_each(
+    points,
+    on_result,
+    providers=ALL_PROVIDERS,
+    timeouts=None,
+    query_cache=None,
+    gdf=None,
+    update_status=log_status,
+    status_var=None,
+    root=None,
+    checkpoint=None,
+    progress=None
+):
+    # points yields (label, lat, lon). on_result(result) is called once per
+    # point, in input order, as results complete. At most ASYNC_MAX_IN_FLIGHT
+    # points are read ahead, so any number of points can be streamed through.
+    # With a BatchCheckpoint, provider results already in the journal are
+    # reused and new ones are recorded as they arrive. progress (a
+    # BatchProgress from LookupScheduler.track_batch) is told how many rows
+    # start and finish. Returns the number of results.
+    loop = asyncio.get_running_loop()
+    timeouts = {**{name: get_provider(name).timeout for name in providers}, **(timeouts or {})}
+    query_cache = {} if query_cache is None else query_cache
+    async_limits = {name: get_provider(name).concurrency() for name in providers}
+    limits = {name: asyncio.Semaphore(limit) for name, limit in async_limits.items()}
+    # Bulk prefetches get their own slots, as many as the most concurrent
+    # provider that answers a whole chunk at once allows
+    prefetch_slots = max(
+        (limit for name, limit in async_limits.items() if get_provider(name).can_batch()), default=1
+    )
+    prefetch_limit = asyncio.Semaphore(prefetch_slots)
+    executor = ThreadPoolExecutor(
+        max_workers=sum(async_limits.values()) + prefetch_slots, thread_name_prefix="enrich"
+    )
+
+    async def call_provider(name, call, on_lookup):
+        async with limits[name]:
+            # The provider's requests stop at the same deadline, freeing the thread
+            deadline = time.monotonic() + timeouts[name]
+            try:
+                value = await asyncio.wait_for(
+                    loop.run_in_executor(executor, call_with_deadline, deadline, call), timeouts[name]
+                )
+            except asyncio.TimeoutError:
+                logging.error(f"{name} lookup timed out after {timeouts[name]} seconds")
+                return None
+            except Exception as e:
+                logging.error(f"Error in {name} lookup: {e}")
+                return None
+            if on_lookup is not None:
+                on_lookup(name, value)
+            return value
+
+    async def lookup_point(row_index, label, lat, lon, prefetched, utm_coords):
+        on_lookup = None
+        if checkpoint is not None:
+            on_lookup = lambda name, value: checkpoint.record(row_index, label, lat, lon, name, value)
+        # Planning can do a local county query (and load its index the first
+        # time), so it runs off the event loop thread
+        results, calls = await loop.run_in_executor(
+            executor, plan_lookup,
+            lat, lon, update_status, status_var, root, query_cache, gdf, prefetched, providers, on_lookup
+        )
+        names = list(calls)
+        values = await asyncio.gather(*(call_provider(name, calls[name], on_lookup) for name in names))
+        results.update(zip(names, values))
+        return build_result(label, lat, lon, results, utm_coords)
+
+    async def lookup_chunk(chunk):
+        # Saved results from the checkpoint, then bulk providers (elevation,
+        # local counties) answer the rest of the chunk in one call
+        try:
+            async with prefetch_limit:
+                prefetched = await loop.run_in_executor(
+                    executor, prefetch_rows, chunk, update_status, status_var, root, providers, checkpoint
+                )
+        except Exception as e:
+            logging.error(f"Error prefetching batch: {e}")
+            prefetched = [{} for _ in chunk]
+        utm_coords = utm_for_points([(lat, lon) for _, _, lat, lon in chunk])
+        results = await asyncio.gather(*(
+            lookup_point(*point, lookups, coords)
+            for point, lookups, coords in zip(chunk, prefetched, utm_coords)
+        ))
+        if checkpoint is not None:
+            await loop.run_in_executor(executor, checkpoint.flush)
+        return results
+
+    pending = deque()
+    written = 0
+
+    async def write_oldest():
+        nonlocal written
+        results = await pending.popleft()
+        for result in results:
+            on_result(result)
+            written += 1
+        if progress is not None:
+            progress.finished(len(results))
+
+    try:
+        rows = ((row_index, label, lat, lon) for row_index, (label, lat, lon) in enumerate(points))
+        for chunk in read_chunks(rows, ELEVATION_BATCH_SIZE):
+            pending.append(asyncio.ensure_future(lookup_chunk(chunk)))
+            if progress is not None:
+                progress.started(len(chunk))
+            # Results are written in order, so wait for the oldest chunk once enough are in flight
+            while len(pending) * ELEVATION_BATCH_SIZE >= ASYNC_MAX_IN_FLIGHT:
+                await write_oldest()
+        while pending:
+            await write_oldest()
+    finally:
+        for task in pending:
+            task.cancel()
+        executor.shutdown(wait=False)
+    return written
+
+async def enrich(points, **kwargs):
+    # Enrich a list of (label, lat, lon) points; returns the results in order
+    results = []
+    await enrich_each(points, results.append, **kwargs)
+    return results
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_engine_loop():
+    # One event loop on a daemon thread, shared by every background run
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="enrich-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+def enrich_in_background(points, on_result, **kwargs):
+    # Runs enrich_each on the shared loop thread, so on_result is called from
+    # that thread. Returns a concurrent.futures.Future of the result count.
+    return asyncio.run_coroutine_threadsafe(enrich_each(points, on_result, **kwargs), get_engine_loop())
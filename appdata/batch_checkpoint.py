@@ -0,0 +1,96 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+
+from lookup_cache import is_cacheable, decode
+
+# Commit the journal after this many recorded provider results
+COMMIT_EVERY = 200
+
+def point_key(label, lat, lon):
+    return f"{label}|{float(lat)!r}|{float(lon)!r}"
+
+# Journal of provider results for a batch job, keyed by input row.
+# Every successful provider answer is recorded as soon as it arrives, so a
+# restarted job only repeats the lookups that had not finished. Each entry
+# also stores the row's label and coordinates, so an edited input file never
+# reuses answers for a row that changed.
+class BatchCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._closed = False
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " row_index INTEGER NOT NULL, point TEXT NOT NULL, provider TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (row_index, provider))"
+        )
+        self._conn.commit()
+        count = self._conn.execute("SELECT COUNT(DISTINCT row_index) FROM results").fetchone()[0]
+        if count:
+            logging.info(f"Resuming from checkpoint {path} with results for {count} rows")
+
+    def record(self, row_index, label, lat, lon, provider, value):
+        # A lookup that outlived its timeout can still answer after the job
+        # closed the checkpoint; that answer is dropped
+        if not is_cacheable(provider, value):
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (row_index, point, provider, value) VALUES (?, ?, ?, ?)",
+                (row_index, point_key(label, lat, lon), provider, json.dumps(value))
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+
+    def load(self, rows):
+        # rows is a list of (row_index, label, lat, lon). Returns
+        # {row_index: {provider: value}} for the rows with saved results.
+        if not rows:
+            return {}
+        keys = {row_index: point_key(label, lat, lon) for row_index, label, lat, lon in rows}
+        saved = {}
+        with self._lock:
+            if self._closed:
+                return saved
+            cursor = self._conn.execute(
+                "SELECT row_index, point, provider, value FROM results WHERE row_index BETWEEN ? AND ?",
+                (min(keys), max(keys))
+            )
+            for row_index, point, provider, value in cursor:
+                if keys.get(row_index) == point:
+                    saved.setdefault(row_index, {})[provider] = decode(provider, json.loads(value))
+        return saved
+
+    def flush(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._conn.commit()
+            self._conn.close()
+
+    def remove(self):
+        # Close and delete the journal once its job has finished
+        self.close()
+        for path in (self.path, self.path + "-wal", self.path + "-shm"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
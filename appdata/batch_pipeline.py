@@ -0,0 +1,204 @@
+import math
+import threading
+import logging
+from queue import Queue
+
+import numpy as np
+
+from fan_out_lookup import fan_out_lookup, prefetch_batch, ALL_PROVIDERS
+from build_result import build_result
+from utm_batch import utm_for_points
+from spatial_order import spatial_order
+from lookup_settings import ELEVATION_BATCH_SIZE, PIPELINE_CHUNKS_PER_WORKER, SPATIAL_ORDER, SPATIAL_ORDER_WINDOW
+from update_status import log_status
+
+# Streaming enrichment: reader -> bounded chunk queue -> workers -> writer.
+#
+# Points are read lazily and grouped into chunks of ELEVATION_BATCH_SIZE so
+# the bulk providers still get full batches. At most
+# workers * PIPELINE_CHUNKS_PER_WORKER chunks exist at any time (queued,
+# being looked up or waiting to be written in order), so memory does not
+# grow with the size of the input.
+#
+# With a spatial order, each window of SPATIAL_ORDER_WINDOW rows is sorted
+# along a space-filling curve before it is cut into chunks, so neighbouring
+# points are looked up together. Results are still written in file order.
+
+def prefetch_rows(rows, update_status=log_status, status_var=None, root=None, providers=ALL_PROVIDERS,
+                  checkpoint=None):
+    # rows is a list of (row_index, label, lat, lon). Returns one prefetched
+    # dict per row for fan_out_lookup: the results saved in the checkpoint,
+    # plus bulk lookups (recorded in the checkpoint) for the rows it does not
+    # fully cover.
+    saved = checkpoint.load(rows) if checkpoint is not None else {}
+    prefetched = [dict(saved.get(row_index, {})) for row_index, _, _, _ in rows]
+
+    for name in providers:
+        # Each bulk provider is only asked for the rows it has no saved result for
+        todo = [i for i, lookups in enumerate(prefetched) if name not in lookups]
+        if not todo:
+            continue
+        try:
+            fetched = prefetch_batch([rows[i][2:] for i in todo], update_status, status_var, root, (name,))
+        except Exception as e:
+            logging.error(f"Error prefetching {name} for rows {rows[0][0]}-{rows[-1][0]}: {e}")
+            continue
+        for i, lookups in zip(todo, fetched):
+            if name in lookups:
+                prefetched[i][name] = lookups[name]
+                if checkpoint is not None:
+                    checkpoint.record(*rows[i], name, lookups[name])
+    return prefetched
+
+def run_pipeline(
+    points,
+    on_result,
+    update_status=log_status,
+    status_var=None,
+    root=None,
+    workers=4,
+    providers=ALL_PROVIDERS,
+    timeouts=None,
+    query_cache=None,
+    gdf=None,
+    checkpoint=None,
+    order=SPATIAL_ORDER
+):
+    # points yields (label, lat, lon). on_result(result) is called from the
+    # calling thread, once per point, in input order. Returns the number of
+    # points written. With a BatchCheckpoint, provider results already in the
+    # journal are reused and new ones are recorded as they arrive.
+    query_cache = {} if query_cache is None else query_cache
+    max_chunks = workers * PIPELINE_CHUNKS_PER_WORKER
+    window = ELEVATION_BATCH_SIZE
+    if order != "none":
+        # A row can only be written once its whole window is done, so every
+        # chunk of a window must fit in flight at once
+        window = SPATIAL_ORDER_WINDOW
+        max_chunks = max(max_chunks, math.ceil(window / ELEVATION_BATCH_SIZE) + workers)
+    chunk_slots = threading.Semaphore(max_chunks)
+    chunk_queue = Queue(maxsize=max_chunks)
+    result_queue = Queue()
+    reader_error = []
+
+    chunk_count = 0
+
+    def send_window(rows):
+        nonlocal chunk_count
+        if order != "none":
+            rows = [rows[i] for i in spatial_order(
+                np.array([row[2] for row in rows]), np.array([row[3] for row in rows]), order
+            )]
+        for start in range(0, len(rows), ELEVATION_BATCH_SIZE):
+            chunk_slots.acquire()  # Backpressure: wait for the writer to catch up
+            chunk_queue.put((chunk_count, rows[start:start + ELEVATION_BATCH_SIZE]))
+            chunk_count += 1
+
+    def reader():
+        try:
+            rows = []
+            for row_index, (label, lat, lon) in enumerate(points):
+                rows.append((row_index, label, lat, lon))
+                if len(rows) == window:
+                    send_window(rows)
+                    rows = []
+            if rows:
+                send_window(rows)
+        except Exception as e:
+            logging.error(f"Error reading input points: {e}")
+            reader_error.append(e)
+        finally:
+            for _ in range(workers):
+                chunk_queue.put(None)
+
+    def lookup_point(row_index, label, lat, lon, prefetched, utm_coords):
+        missing = [name for name in providers if name not in prefetched]
+        if not missing:
+            # Everything came from the journal or a bulk lookup
+            return build_result(label, lat, lon, prefetched, utm_coords)
+
+        on_lookup = None
+        if checkpoint is not None:
+            on_lookup = lambda name, value: checkpoint.record(row_index, label, lat, lon, name, value)
+        try:
+            lookups = fan_out_lookup(
+                lat, lon, update_status, status_var, root, query_cache,
+                gdf=gdf, timeouts=timeouts, prefetched=prefetched, providers=providers, on_result=on_lookup
+            )
+        except Exception as e:
+            logging.error(f"Error looking up {label}: {e}")
+            lookups = prefetched
+        return build_result(label, lat, lon, lookups, utm_coords)
+
+    def failed_result(label, lat, lon):
+        # An all-N/A row for a point whose lookup raised
+        try:
+            return build_result(label, lat, lon, {}, (None, None, None))
+        except Exception:
+            return {"label": label, "latitude": lat, "longitude": lon}
+
+    def lookup_chunk(chunk):
+        prefetched = prefetch_rows(chunk, update_status, status_var, root, providers, checkpoint)
+        utm_coords = utm_for_points([(lat, lon) for _, _, lat, lon in chunk])
+        results = []
+        for point, lookups, coords in zip(chunk, prefetched, utm_coords):
+            try:
+                results.append(lookup_point(*point, lookups, coords))
+            except Exception as e:
+                logging.error(f"Error building the result for {point[1]}: {e}")
+                results.append(failed_result(*point[1:]))
+        if checkpoint is not None:
+            checkpoint.flush()
+        return results
+
+    def worker():
+        while True:
+            item = chunk_queue.get()
+            if item is None:
+                break
+            chunk_index, chunk = item
+            # Every chunk must reach the writer, or it waits on its rows forever
+            # and the reader blocks on a chunk slot that is never freed
+            try:
+                results = lookup_chunk(chunk)
+            except Exception as e:
+                logging.error(f"Error processing batch {chunk_index}: {e}")
+                results = [failed_result(label, lat, lon) for _, label, lat, lon in chunk]
+            result_queue.put((chunk_index, [row[0] for row in chunk], results))
+
+    threads = [threading.Thread(target=reader, daemon=True)]
+    threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    def finish():
+        for thread in threads:
+            thread.join()
+        result_queue.put(None)
+    threading.Thread(target=finish, daemon=True).start()
+
+    # Write rows back in input order as soon as each one is complete. A
+    # chunk's slot is freed once all of its rows have been written.
+    pending = {}          # row_index -> (chunk_index, result)
+    rows_left = {}        # chunk_index -> rows not yet written
+    written = 0
+    while True:
+        item = result_queue.get()
+        if item is None:
+            break
+        chunk_index, row_indexes, results = item
+        rows_left[chunk_index] = len(results)
+        for row_index, result in zip(row_indexes, results):
+            pending[row_index] = (chunk_index, result)
+        while written in pending:
+            chunk_index, result = pending.pop(written)
+            on_result(result)
+            written += 1
+            rows_left[chunk_index] -= 1
+            if not rows_left[chunk_index]:
+                del rows_left[chunk_index]
+                chunk_slots.release()
+
+    if reader_error:
+        raise reader_error[0]
+    return written
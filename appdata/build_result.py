@@ -0,0 +1,28 @@
+from generate_google_maps_link import generate_google_maps_link
+from convert_latlon_utm import convert_latlon_utm
+from providers import PROVIDERS
+
+# Merge the per-provider lookups from fan_out_lookup into a result row, with
+# the fields of every registered provider. Any provider that failed, timed
+# out or was not asked comes back as None and is shown as 'N/A'.
+# Batch callers pass utm_coords (zone, easting, northing) from
+# utm_batch.utm_for_points instead of converting one point at a time.
+def build_result(label, lat, lon, lookups, utm_coords=None):
+    if utm_coords is not None:
+        utm_zone, utm_easting, utm_northing = utm_coords
+    else:
+        _, _, utm_zone, utm_easting, utm_northing = convert_latlon_utm(lat, lon, None, None, None)
+    google_maps_link = generate_google_maps_link(lat, lon)
+
+    result = {
+        "label": label,
+        "latitude": lat,
+        "longitude": lon,
+        "utm_zone": utm_zone,
+        "utm_easting": utm_easting,
+        "utm_northing": utm_northing,
+    }
+    for name, provider in PROVIDERS.items():
+        result.update(provider.result_values(lookups.get(name)))
+    result["google_maps"] = google_maps_link
+    return result
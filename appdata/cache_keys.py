@@ -0,0 +1,33 @@
+from lookup_settings import CACHE_KEY_MODE, CACHE_KEY_DECIMALS, CACHE_GEOHASH_PRECISION
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(lat, lon, precision=9):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        value_range, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits = bits << 1
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def snap_key(lat, lon, decimals=5):
+    return f"{round(float(lat), decimals):.{decimals}f},{round(float(lon), decimals):.{decimals}f}"
+
+def cache_key(provider, lat, lon):
+    # Nearby points share a key, so 44.600702 and 44.6007021 hit the same entry
+    if CACHE_KEY_MODE == "geohash":
+        return "gh:" + geohash_encode(float(lat), float(lon), CACHE_GEOHASH_PRECISION.get(provider, 9))
+    return snap_key(lat, lon, CACHE_KEY_DECIMALS.get(provider, 5))
@@ -1,30 +1,9 @@
-import tkinter as tk
-
-def clear_results(entry_label, entry_lon, entry_lat, entry_utm_zone, entry_utm_easting, entry_utm_northing, label_var, lat_var, lon_var, utm_zone_var, utm_easting_var, utm_northing_var, state_var, county_var, elevation_var, region_var, subregion_var, subbasin_var, watershed_var, subwatershed_var, catchment_var, huc12_var, principle_meridian_var, township_var, range_var, qqsec_var, google_maps_var):
+def clear_results(entry_label, entry_lon, entry_lat, entry_utm_zone, entry_utm_easting, entry_utm_northing, result_vars):
     entry_lat.delete(0, 'end')
     entry_label.delete(0, 'end')
     entry_lon.delete(0, 'end')
     entry_utm_zone.delete(0, 'end')
     entry_utm_easting.delete(0, 'end')
     entry_utm_northing.delete(0, 'end')
-    label_var.set("")
-    lat_var.set("")
-    lon_var.set("")
-    utm_zone_var.set("")
-    utm_easting_var.set("")
-    utm_northing_var.set("")
-    state_var.set("")
-    county_var.set("")
-    elevation_var.set("")
-    region_var.set("")
-    subregion_var.set("")
-    subbasin_var.set("")
-    watershed_var.set("")
-    subwatershed_var.set("")
-    catchment_var.set("")
-    huc12_var.set("")
-    principle_meridian_var.set("")
-    township_var.set("")
-    range_var.set("")
-    qqsec_var.set("")
-    google_maps_var.set("")
+    for var in result_vars.values():
+        var.set("")
@@ -1,26 +1,46 @@
+import threading
+import logging
+
 import utm
-from tkinter import messagebox
+
+from utm_batch import parse_utm_zone
+from gui_bridge import get_gui_bridge
+
+def show_input_error(message):
+    # A dialog only for input typed on the Tk thread. Lookups build their
+    # results on worker threads, where a bad point is logged and comes back
+    # as N/A instead of stacking up one modal dialog per point.
+    if get_gui_bridge() is None or threading.current_thread() is not threading.main_thread():
+        logging.error(f"Input error: {message}")
+        return
+    # Imported here so the conversion also works without a display
+    from tkinter import messagebox
+    messagebox.showerror("Input Error", message)
+
+def has_value(value):
+    # 0 is a valid coordinate; only None and blank entries are missing
+    return value is not None and str(value).strip() != ""
 
 def convert_latlon_utm(lat, lon, utm_zone, utm_easting, utm_northing):
-    if lat and lon:
+    if has_value(lat) and has_value(lon):
         try:
             lat = round(float(lat), 4)
             lon = round(float(lon), 4)
             utm_coords = utm.from_latlon(lat, lon)
             return lat, lon, utm_coords[2], round(utm_coords[0]), round(utm_coords[1])
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid latitude and longitude.")
+            show_input_error("Please enter valid latitude and longitude.")
             return None, None, None, None, None
-    elif utm_zone and utm_easting and utm_northing:
+    elif has_value(utm_zone) and has_value(utm_easting) and has_value(utm_northing):
         try:
-            utm_zone = int(utm_zone)
+            utm_zone, northern = parse_utm_zone(utm_zone)
             utm_easting = round(float(utm_easting))
             utm_northing = round(float(utm_northing))
-            latlon_coords = utm.to_latlon(utm_easting, utm_northing, utm_zone, 'N')
+            latlon_coords = utm.to_latlon(utm_easting, utm_northing, utm_zone, northern=northern)
             return round(latlon_coords[0], 4), round(latlon_coords[1], 4), utm_zone, utm_easting, utm_northing
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter valid UTM coordinates.")
+            show_input_error("Please enter valid UTM coordinates.")
             return None, None, None, None, None
     else:
-        messagebox.showerror("Input Error", "Please enter either latitude/longitude or UTM coordinates.")
+        show_input_error("Please enter either latitude/longitude or UTM coordinates.")
         return None, None, None, None, None
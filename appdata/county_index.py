@@ -0,0 +1,73 @@
+import os
+import threading
+import logging
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely import STRtree
+
+from lookup_settings import COUNTY_BOUNDARY_PATH
+
+# State FIPS code -> state name as the FCC API reports it
+STATE_FIPS = {
+    "01": "Alabama", "02": "Alaska", "04": "Arizona", "05": "Arkansas", "06": "California",
+    "08": "Colorado", "09": "Connecticut", "10": "Delaware", "11": "District of Columbia",
+    "12": "Florida", "13": "Georgia", "15": "Hawaii", "16": "Idaho", "17": "Illinois",
+    "18": "Indiana", "19": "Iowa", "20": "Kansas", "21": "Kentucky", "22": "Louisiana",
+    "23": "Maine", "24": "Maryland", "25": "Massachusetts", "26": "Michigan", "27": "Minnesota",
+    "28": "Mississippi", "29": "Missouri", "30": "Montana", "31": "Nebraska", "32": "Nevada",
+    "33": "New Hampshire", "34": "New Jersey", "35": "New Mexico", "36": "New York",
+    "37": "North Carolina", "38": "North Dakota", "39": "Ohio", "40": "Oklahoma", "41": "Oregon",
+    "42": "Pennsylvania", "44": "Rhode Island", "45": "South Carolina", "46": "South Dakota",
+    "47": "Tennessee", "48": "Texas", "49": "Utah", "50": "Vermont", "51": "Virginia",
+    "53": "Washington", "54": "West Virginia", "55": "Wisconsin", "56": "Wyoming",
+    "60": "American Samoa", "66": "Guam", "69": "Northern Mariana Islands",
+    "72": "Puerto Rico", "78": "United States Virgin Islands",
+}
+
+def load_counties(path):
+    # Shapefiles are slow to parse, so keep a GeoParquet copy next to the source
+    base, ext = os.path.splitext(path)
+    parquet_path = path if ext.lower() == ".parquet" else base + ".parquet"
+    if os.path.exists(parquet_path):
+        counties = gpd.read_parquet(parquet_path)
+    else:
+        logging.debug(f"Converting county boundaries {path} to GeoParquet...")
+        counties = gpd.read_file(path)
+        counties = counties[['STATEFP', 'NAMELSAD', 'geometry']]
+        counties.to_parquet(parquet_path)
+    if counties.crs is not None and counties.crs.to_epsg() != 4326:
+        counties = counties.to_crs(4326)
+    return counties
+
+# Offline reverse geocoder for state and county names
+class CountyIndex:
+    def __init__(self, path=COUNTY_BOUNDARY_PATH):
+        logging.debug(f"Loading county boundaries from {path}...")
+        counties = load_counties(path)
+        self.states = np.array([STATE_FIPS.get(fips) for fips in counties['STATEFP']], dtype=object)
+        self.counties = counties['NAMELSAD'].to_numpy(dtype=object)
+        self.tree = STRtree(counties.geometry.values)
+        logging.debug(f"County index ready: {len(self.counties)} counties")
+
+    def lookup_many(self, lats, lons):
+        # Returns a (state, county) tuple per point, (None, None) outside every county
+        points = shapely.points(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        hits = np.full(len(points), -1, dtype=np.int64)
+        point_idx, poly_idx = self.tree.query(points, predicate='intersects')
+        first = np.unique(point_idx, return_index=True)[1]
+        hits[point_idx[first]] = poly_idx[first]
+        return [(self.states[hit], self.counties[hit]) if hit >= 0 else (None, None) for hit in hits]
+
+    def lookup(self, lat, lon):
+        return self.lookup_many([lat], [lon])[0]
+
+_county_index = None
+_county_index_lock = threading.Lock()
+
+def load_county_index():
+    global _county_index
+    with _county_index_lock:
+        if _county_index is None:
+            _county_index = CountyIndex()
+        return _county_index
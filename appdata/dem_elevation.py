@@ -0,0 +1,145 @@
+import os
+import json
+import math
+import threading
+import logging
+import numpy as np
+
+from lookup_settings import DEM_TILE_DIR, DEM_INTERPOLATION
+
+# Offline elevations from local DEM GeoTIFF tiles.
+#
+# Each GeoTIFF is converted once to a raw .npy grid plus a .json sidecar with
+# its geotransform, next to the tile. After that the grid is memory-mapped, so
+# only the pages under the sampled points are ever read from disk.
+
+class DemTile:
+    def __init__(self, npy_path, meta):
+        self.grid = np.load(npy_path, mmap_mode='r')
+        self.x0, self.dx, self.y0, self.dy = meta["x0"], meta["dx"], meta["y0"], meta["dy"]
+        self.nodata = meta.get("nodata")
+        rows, cols = self.grid.shape
+        self.west, self.north = self.x0, self.y0
+        self.east, self.south = self.x0 + cols * self.dx, self.y0 + rows * self.dy
+
+    def sample(self, lats, lons, interpolation):
+        rows, cols = self.grid.shape
+        # Fractional pixel coordinates, pixel centres sit on whole numbers
+        col = (lons - self.x0) / self.dx - 0.5
+        row = (lats - self.y0) / self.dy - 0.5
+
+        if interpolation == "nearest":
+            c = np.clip(np.rint(col).astype(np.int64), 0, cols - 1)
+            r = np.clip(np.rint(row).astype(np.int64), 0, rows - 1)
+            values = self.grid[r, c].astype(np.float64)
+            return self._mask_nodata(values, self.grid[r, c])
+
+        c0 = np.clip(np.floor(col).astype(np.int64), 0, cols - 2)
+        r0 = np.clip(np.floor(row).astype(np.int64), 0, rows - 2)
+        fc = np.clip(col - c0, 0.0, 1.0)
+        fr = np.clip(row - r0, 0.0, 1.0)
+
+        corners = [self.grid[r0, c0], self.grid[r0, c0 + 1], self.grid[r0 + 1, c0], self.grid[r0 + 1, c0 + 1]]
+        z00, z01, z10, z11 = (self._mask_nodata(z.astype(np.float64), z) for z in corners)
+        top = z00 * (1 - fc) + z01 * fc
+        bottom = z10 * (1 - fc) + z11 * fc
+        return top * (1 - fr) + bottom * fr
+
+    def _mask_nodata(self, values, raw):
+        if self.nodata is not None:
+            values[raw == self.nodata] = np.nan
+        return values
+
+def convert_tile(tif_path, npy_path, meta_path):
+    # rasterio is only needed for this one-time conversion
+    import rasterio
+
+    logging.debug(f"Converting DEM tile {tif_path} for memory mapping...")
+    with rasterio.open(tif_path) as src:
+        grid = src.read(1)
+        transform = src.transform
+        meta = {
+            "x0": transform.c, "dx": transform.a,
+            "y0": transform.f, "dy": transform.e,
+            "nodata": src.nodata,
+        }
+    np.save(npy_path, grid)
+    with open(meta_path, 'w', encoding='utf-8') as metafile:
+        json.dump(meta, metafile)
+
+class DemTileIndex:
+    def __init__(self, tile_dir=DEM_TILE_DIR):
+        self.tiles = []
+        # Whole-degree cell (floor(lat), floor(lon)) -> tiles covering it
+        self.cells = {}
+
+        for name in sorted(os.listdir(tile_dir)):
+            if not name.lower().endswith(('.tif', '.tiff')):
+                continue
+            tif_path = os.path.join(tile_dir, name)
+            base = os.path.splitext(tif_path)[0]
+            npy_path, meta_path = base + ".npy", base + ".json"
+            if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+                convert_tile(tif_path, npy_path, meta_path)
+            with open(meta_path, 'r', encoding='utf-8') as metafile:
+                tile = DemTile(npy_path, json.load(metafile))
+            self.add_tile(tile)
+
+        logging.debug(f"Indexed {len(self.tiles)} DEM tile(s) from {tile_dir}")
+
+    def add_tile(self, tile):
+        self.tiles.append(tile)
+        tile_number = len(self.tiles) - 1
+        for lat_cell in range(math.floor(tile.south), math.ceil(tile.north)):
+            for lon_cell in range(math.floor(tile.west), math.ceil(tile.east)):
+                self.cells.setdefault((lat_cell, lon_cell), []).append(tile_number)
+
+    def sample(self, lats, lons, interpolation=DEM_INTERPOLATION):
+        # Vectorised over arrays of coordinates, NaN where no tile has data
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        elevations = np.full(lats.shape, np.nan)
+
+        lat_cells = np.floor(lats).astype(np.int64)
+        lon_cells = np.floor(lons).astype(np.int64)
+        keys, inverse = np.unique(np.stack([lat_cells, lon_cells], axis=-1).reshape(-1, 2), axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        flat_lats, flat_lons, flat_out = lats.reshape(-1), lons.reshape(-1), elevations.reshape(-1)
+
+        # Group the points by cell, then do one numpy pass per tile rather than per point
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(keys) + 1))
+        for key_number, (lat_cell, lon_cell) in enumerate(keys):
+            selected = order[bounds[key_number]:bounds[key_number + 1]]
+            for tile_number in self.cells.get((int(lat_cell), int(lon_cell)), []):
+                tile = self.tiles[tile_number]
+                pending = selected[np.isnan(flat_out[selected])]
+                if pending.size == 0:
+                    break
+                inside = pending[
+                    (flat_lons[pending] >= tile.west) & (flat_lons[pending] <= tile.east) &
+                    (flat_lats[pending] >= tile.south) & (flat_lats[pending] <= tile.north)
+                ]
+                if inside.size:
+                    flat_out[inside] = tile.sample(flat_lats[inside], flat_lons[inside], interpolation)
+
+        return elevations
+
+_dem_index = None
+_dem_index_lock = threading.Lock()
+
+def load_dem_index(tile_dir=DEM_TILE_DIR):
+    global _dem_index
+    with _dem_index_lock:
+        if _dem_index is None:
+            _dem_index = DemTileIndex(tile_dir)
+        return _dem_index
+
+def get_dem_elevations(points):
+    # Same output shape as get_elevations: one value per point, 'N/A' when unknown
+    points = list(points)
+    if not points:
+        return []
+    coords = np.asarray(points, dtype=np.float64)
+    elevations = load_dem_index().sample(coords[:, 0], coords[:, 1])
+    return [round(float(e), 1) if not np.isnan(e) else 'N/A' for e in elevations]
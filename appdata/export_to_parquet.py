@@ -0,0 +1,123 @@
+import json
+import logging
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+
+from result_store import ResultStore
+from lookup_settings import PARQUET_ROW_GROUP_SIZE, PARQUET_COMPRESSION
+
+# GeoParquet output: the result columns, typed, plus a WKB point geometry in
+# lon/lat (OGC:CRS84, the GeoParquet default). The Google Maps link is left
+# out, it is rebuilt from the coordinates by anything that needs it.
+
+# Arrow type of each result field kind
+ARROW_TYPES = {
+    "text": pa.string(),
+    "float": pa.float64(),
+    "int": pa.int64(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+}
+
+def result_schema(store):
+    fields = [pa.field(field.key, ARROW_TYPES[field.kind]) for field in store.fields if field.kind != "link"]
+    fields.append(pa.field("geometry", pa.binary()))
+    return pa.schema(fields)
+
+def geo_metadata(bbox=None):
+    column = {"encoding": "WKB", "geometry_types": ["Point"]}
+    if bbox is not None:
+        column["bbox"] = bbox
+    return {b"geo": json.dumps({"version": "1.0.0", "primary_column": "geometry", "columns": {"geometry": column}})}
+
+def results_table(store):
+    # pyarrow Table of everything in a ResultStore
+    df = store.to_dataframe()
+    columns = {}
+    for field in store.fields:
+        if field.kind == "category":
+            values = df[field.key].cat
+            columns[field.key] = pa.DictionaryArray.from_arrays(
+                pa.array(values.codes.astype(np.int32)), pa.array(list(values.categories), pa.string())
+            )
+        elif field.kind != "link":
+            columns[field.key] = pa.array(df[field.key], ARROW_TYPES[field.kind])
+
+    lats = df["latitude"].to_numpy()
+    lons = df["longitude"].to_numpy()
+    valid = np.isfinite(lats) & np.isfinite(lons)
+    geometry = np.full(len(df), None, dtype=object)
+    geometry[valid] = shapely.to_wkb(shapely.points(lons[valid], lats[valid]))
+    columns["geometry"] = pa.array(geometry, pa.binary())
+    return pa.Table.from_pydict(columns, schema=result_schema(store))
+
+def write_geoparquet(store, path):
+    table = results_table(store)
+    lats = table.column("latitude").to_numpy()
+    lons = table.column("longitude").to_numpy()
+    bbox = None
+    if np.isfinite(lats).any():
+        bbox = [float(np.nanmin(lons)), float(np.nanmin(lats)), float(np.nanmax(lons)), float(np.nanmax(lats))]
+    table = table.replace_schema_metadata(geo_metadata(bbox))
+    pq.write_table(table, path, compression=PARQUET_COMPRESSION, row_group_size=PARQUET_ROW_GROUP_SIZE)
+
+# Streaming GeoParquet writer for batch jobs: results are buffered in a small
+# ResultStore and written out as a row group every row_group_size rows, so
+# memory stays flat however many rows are written. The file is only valid
+# once close() has written the footer.
+class ParquetResultWriter:
+    def __init__(self, path, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._buffer = ResultStore()
+        self._writer = pq.ParquetWriter(
+            path, result_schema(self._buffer).with_metadata(geo_metadata()), compression=PARQUET_COMPRESSION
+        )
+
+    def write(self, result):
+        self._buffer.append(result)
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if len(self._buffer):
+            self._writer.write_table(results_table(self._buffer))
+            self.rows_written += len(self._buffer)
+            logging.debug(f"Wrote row group of {len(self._buffer)} rows to {self.path}")
+            self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Function to export cumulative results to a GeoParquet file
+def export_to_parquet(cumulative_results):
+    # Imported here so the writers above also work without a display
+    from tkinter import filedialog, messagebox
+
+    if not len(cumulative_results):
+        messagebox.showwarning("Export Warning", "No data to export.")
+        return
+
+    try:
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".parquet",
+            filetypes=[("GeoParquet files", "*.parquet")]
+        )
+        if file_path:
+            write_geoparquet(cumulative_results, file_path)
+            logging.info(f"GeoParquet successfully written to: {file_path}")
+            messagebox.showinfo("Export Successful", "Data has been successfully exported to GeoParquet.")
+
+    except Exception as e:
+        logging.error(f"Error during GeoParquet export: {e}")
+        messagebox.showerror("Export Error", f"An error occurred while exporting data: {e}")
@@ -0,0 +1,114 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from get_state_county import is_plss_state
+from get_plss_data import parse_plss_attributes
+from lookup_cache import cached_lookup, cached_batch_lookup
+from providers import LookupContext, get_provider, provider_names
+from http_session import call_with_deadline
+from lookup_settings import FAN_OUT_WORKERS, STATE_COUNTY_PROVIDER
+
+# Shared pool so a provider that overruns its timeout keeps running in the
+# background instead of blocking the caller on shutdown
+_executor = ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS, thread_name_prefix="lookup")
+
+# Every registered provider, the default for a run
+ALL_PROVIDERS = provider_names()
+
+def configure_fan_out(max_workers):
+    # Resize the shared pool, e.g. when many points are looked up at once
+    global _executor
+    old_executor = _executor
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lookup")
+    old_executor.shutdown(wait=False)
+
+def prefetch_batch(points, update_status, status_var, root, providers=ALL_PROVIDERS):
+    # Look up the providers that have a bulk API (batch elevations, local
+    # county boundaries) for a whole batch of (lat, lon) points at once.
+    # Returns one prefetched dict per point for fan_out_lookup.
+    points = list(points)
+    prefetched = [{} for _ in points]
+    context = LookupContext(update_status, status_var, root)
+    for name in providers:
+        provider = get_provider(name)
+        if not provider.can_batch():
+            continue
+        values = cached_batch_lookup(
+            name, points, lambda misses, provider=provider: provider.lookup_many(misses, context)
+        )
+        for lookups, value in zip(prefetched, values):
+            lookups[name] = value
+    return prefetched
+
+def plan_lookup(lat, lon, update_status, status_var, root, query_cache, gdf=None, prefetched=None,
+                providers=ALL_PROVIDERS, on_result=None):
+    # Work out what a point still needs. Returns (results, calls): the
+    # answers already known and a cached call per provider left to query.
+    context = LookupContext(update_status, status_var, root, query_cache, gdf)
+
+    # Providers left out of this run are reported as 'N/A'
+    results = {name: None for name in provider_names() if name not in providers}
+
+    # Every provider answer goes through the shared persistent cache
+    calls = {
+        name: (lambda provider=get_provider(name): cached_lookup(
+            provider.name, lat, lon, lambda: provider.lookup(lat, lon, context)
+        ))
+        for name in providers
+    }
+
+    # Results already looked up in bulk (e.g. batch elevations) are not requested again
+    results.update(prefetched or {})
+    for name in results:
+        calls.pop(name, None)
+
+    # A local state lookup takes microseconds, so do it first and skip the
+    # PLSS request for points in states that were never PLSS surveyed
+    if STATE_COUNTY_PROVIDER == "local" and "state_county" in calls:
+        results["state_county"] = calls.pop("state_county")()
+        if on_result is not None:
+            on_result("state_county", results["state_county"])
+    state = (results.get("state_county") or (None, None))[0]
+    if "plss" in calls and not is_plss_state(state):
+        logging.debug(f"Skipping PLSS lookup, {state} is not a PLSS state")
+        calls.pop("plss")
+        results["plss"] = parse_plss_attributes(None)
+    return results, calls
+
+def fan_out_lookup(lat, lon, update_status, status_var, root, query_cache, gdf=None, timeouts=None, prefetched=None,
+                   providers=ALL_PROVIDERS, on_result=None):
+    # on_result(name, value) is called as soon as each requested provider
+    # answers, e.g. to journal progress of a batch job
+    logging.debug(f"fan_out_lookup called with lat: {lat}, lon: {lon}")
+    timeouts = {**{name: get_provider(name).timeout for name in providers}, **(timeouts or {})}
+    results, calls = plan_lookup(
+        lat, lon, update_status, status_var, root, query_cache, gdf, prefetched, providers, on_result
+    )
+
+    # Every provider talks to a different host, so send every lookup at once.
+    # Each one's requests stop at its timeout, so a lookup given up on here
+    # does not keep holding a pool thread.
+    start = time.monotonic()
+    futures = {
+        name: _executor.submit(call_with_deadline, start + timeouts[name], call) for name, call in calls.items()
+    }
+    if on_result is not None:
+        for name, future in futures.items():
+            future.add_done_callback(
+                lambda future, name=name: future.exception() is None and on_result(name, future.result())
+            )
+
+    for name, future in futures.items():
+        remaining = max(0, start + timeouts[name] - time.monotonic())
+        try:
+            results[name] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            logging.error(f"{name} lookup timed out after {timeouts[name]} seconds")
+            results[name] = None
+        except Exception as e:
+            logging.error(f"Error in {name} lookup: {e}")
+            results[name] = None
+
+    logging.debug(f"fan_out_lookup finished in {time.monotonic() - start:.2f} seconds")
+    return results
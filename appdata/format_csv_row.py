@@ -0,0 +1,16 @@
+from providers import result_fields
+
+# Column layout of exported CSV files, shared by the GUI export and the CLI:
+# the base columns, every registered provider's fields and the map link
+CSV_FIELDS = result_fields()
+CSV_HEADERS = [field.header for field in CSV_FIELDS]
+
+def format_csv_row(result):
+    row = []
+    for field in CSV_FIELDS:
+        value = result.get(field.key, "")
+        if field.key in ("latitude", "longitude"):
+            # Round latitude and longitude to 4 decimal places if they exist
+            value = round(float(value), 4) if value not in (None, "", 'N/A') else ""
+        row.append(value if value is not None else "")
+    return row
@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import csv
+import logging
+import sys
+
+from fan_out_lookup import configure_fan_out, ALL_PROVIDERS
+from batch_pipeline import run_pipeline
+from async_engine import enrich_each
+from ingest_points import ingest_points
+from batch_checkpoint import BatchCheckpoint
+from format_csv_row import CSV_HEADERS, format_csv_row
+from export_to_parquet import ParquetResultWriter
+from lookup_cache import LookupCache, get_lookup_cache, set_lookup_cache
+from rate_limiter import rate_limiter_stats
+from http_session import close_session
+from single_flight import single_flight
+from spatial_order import SPATIAL_ORDER_METHODS
+from lookup_settings import ELEVATION_BATCH_SIZE, SPATIAL_ORDER
+
+# Headless enrichment of a file of points:
+#   python geolookup_cli.py points.csv results.csv --workers 8 --providers elevation,watershed
+#   python geolookup_cli.py wells.gpkg wells.parquet --label-col well_id
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Add elevation, state/county, watershed and PLSS data to a file of points.")
+    parser.add_argument("input", help="CSV, Parquet/GeoParquet, GeoPackage or Shapefile of points; CSV and Parquet "
+                                      "need lat/lon or UTM zone/easting/northing columns (like import_example.csv)")
+    parser.add_argument("output", help="CSV to write, same columns as the GUI export; a .parquet name writes GeoParquet")
+    parser.add_argument("--workers", type=int, default=4, help="points looked up at the same time (default 4)")
+    parser.add_argument("--providers", default=",".join(ALL_PROVIDERS),
+                        help=f"comma separated providers to query (default {','.join(ALL_PROVIDERS)})")
+    parser.add_argument("--cache", metavar="PATH", help="lookup cache file to use instead of the default")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the lookup cache")
+    parser.add_argument("--timeout", type=float, help="seconds to wait for each provider per point")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="journal of finished lookups; rerunning with the same journal resumes the job")
+    parser.add_argument("--order", choices=SPATIAL_ORDER_METHODS, default=SPATIAL_ORDER,
+                        help="look points up in spatial order (hilbert, zorder, grid) for better cache reuse; "
+                             "the output keeps the input order")
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads",
+                        help="threads: worker threads (default); async: asyncio engine with hundreds of lookups in flight")
+    for role in ("label", "lat", "lon", "zone", "easting", "northing"):
+        parser.add_argument(f"--{role}-col", metavar="NAME", help=f"column holding the {role} (default: guessed from the header)")
+    parser.add_argument("--rejects", metavar="PATH", help="CSV for rows that cannot be used (default <input>_rejects.csv)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every lookup")
+    args = parser.parse_args(argv)
+
+    args.providers = tuple(p.strip() for p in args.providers.split(",") if p.strip())
+    unknown = set(args.providers) - set(ALL_PROVIDERS)
+    if unknown:
+        parser.error(f"unknown provider(s): {', '.join(sorted(unknown))}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.engine == "async" and args.order != "none":
+        parser.error("--order is only supported by the threads engine")
+    args.columns = {
+        role: getattr(args, f"{role}_col")
+        for role in ("label", "lat", "lon", "zone", "easting", "northing")
+        if getattr(args, f"{role}_col")
+    }
+    return args
+
+def run_enrichment(input_path, on_result, workers=4, providers=ALL_PROVIDERS, timeouts=None, checkpoint=None,
+                   engine="threads", order=SPATIAL_ORDER, columns=None, rejects_path=None):
+    points = ingest_points(input_path, columns, rejects_path)
+    if engine == "async":
+        return asyncio.run(enrich_each(points, on_result, providers=providers, timeouts=timeouts, checkpoint=checkpoint))
+    # Each provider call runs on the fan-out pool, so size it for every point in flight
+    configure_fan_out(workers * len(ALL_PROVIDERS))
+    return run_pipeline(
+        points, on_result,
+        workers=workers, providers=providers, timeouts=timeouts, checkpoint=checkpoint, order=order
+    )
+
+def enrich_csv(input_path, output_path, workers=4, providers=ALL_PROVIDERS, timeouts=None, checkpoint=None,
+               engine="threads", order=SPATIAL_ORDER, columns=None, rejects_path=None):
+    written = 0
+
+    def log_progress():
+        nonlocal written
+        written += 1
+        if written % ELEVATION_BATCH_SIZE == 0:
+            logging.info(f"Processed {written} records")
+
+    options = dict(workers=workers, providers=providers, timeouts=timeouts, checkpoint=checkpoint,
+                   engine=engine, order=order, columns=columns, rejects_path=rejects_path)
+
+    # .parquet output is GeoParquet, written a row group at a time
+    if output_path.lower().endswith((".parquet", ".geoparquet")):
+        with ParquetResultWriter(output_path) as writer:
+            def write_row(result):
+                writer.write(result)
+                log_progress()
+            return run_enrichment(input_path, write_row, **options)
+
+    # Line buffered, so every finished row reaches the file and an interrupted
+    # run leaves a valid partial CSV
+    with open(output_path, 'w', encoding='utf-8', newline='', buffering=1) as outfile:
+        csv_writer = csv.writer(outfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        csv_writer.writerow(CSV_HEADERS)
+
+        def write_result(result):
+            csv_writer.writerow(format_csv_row(result))
+            log_progress()
+
+        return run_enrichment(input_path, write_result, **options)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    if args.no_cache:
+        set_lookup_cache(None)
+    elif args.cache:
+        set_lookup_cache(LookupCache(args.cache))
+
+    timeouts = {name: args.timeout for name in ALL_PROVIDERS} if args.timeout else None
+    # Rows already in the journal are rebuilt from it, so the output is
+    # always rewritten from the first row
+    checkpoint = BatchCheckpoint(args.checkpoint) if args.checkpoint else None
+    try:
+        written = enrich_csv(
+            args.input, args.output, args.workers, args.providers, timeouts, checkpoint, args.engine, args.order,
+            args.columns, args.rejects
+        )
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    logging.info(f"Wrote {written} records to {args.output}")
+
+    lookup_cache = get_lookup_cache()
+    if lookup_cache is not None:
+        logging.info(f"Lookup cache hits/misses: {lookup_cache.stats()}")
+        lookup_cache.close()
+    logging.info(f"Provider request rates: {rate_limiter_stats()}")
+    logging.info(f"Lookups shared with an identical in-flight lookup: {single_flight.shared}")
+    close_session()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
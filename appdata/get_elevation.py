@@ -1,43 +1,67 @@
-import time
 import requests
 import logging
 
+from rate_limiter import limited_get
+from lookup_settings import ELEVATION_BATCH_SIZE, ELEVATION_PROVIDER
+
+ELEVATION_URL = "https://api.opentopodata.org/v1/ned10m"
+
+def fetch_elevation_chunk(chunk, update_status, status_var, root):
+    locations = "|".join(f"{lat},{lon}" for lat, lon in chunk)
+    query_elevation = f"{ELEVATION_URL}?locations={locations}"
+
+    def on_retry(retry_after):
+        update_status(f"Elevation data timeout, retrying in {retry_after} second(s)...", status_var, root)
+
+    logging.debug(f"Requesting elevation data for {len(chunk)} location(s)")
+    response_elevation = limited_get(query_elevation, on_retry=on_retry)
+    logging.debug(f"Response status code: {response_elevation.status_code}")
+    response_elevation.raise_for_status()  # Raise for errors, including a 429 that outlasted the retries
+
+    elevations = []
+    for result in response_elevation.json()['results']:
+        if result['elevation'] is not None:
+            elevations.append(round(result['elevation'], 1))
+        else:
+            elevations.append('N/A')
+    return elevations
+
+def get_elevations(points, update_status, status_var, root):
+    # Look up many (lat, lon) points with as few requests as possible.
+    # Returns one elevation per input point, in input order.
+    points = list(points)
+    logging.debug(f"get_elevations called with {len(points)} point(s)")
+
+    if ELEVATION_PROVIDER == "dem":
+        # Local tiles need no network, so sample everything in one pass
+        from dem_elevation import get_dem_elevations
+        try:
+            return get_dem_elevations(points)
+        except Exception as e:
+            logging.error(f"Error reading local DEM elevations: {e}")
+            return ['N/A'] * len(points)
+
+    elevations = []
+    for start in range(0, len(points), ELEVATION_BATCH_SIZE):
+        chunk = points[start:start + ELEVATION_BATCH_SIZE]
+        update_status(f"Fetching elevation data for points {start + 1}-{start + len(chunk)}...", status_var, root)
+        try:
+            chunk_elevations = fetch_elevation_chunk(chunk, update_status, status_var, root)
+            if len(chunk_elevations) != len(chunk):
+                raise ValueError(f"expected {len(chunk)} elevations, got {len(chunk_elevations)}")
+            elevations.extend(chunk_elevations)
+        except requests.exceptions.HTTPError as http_err:
+            logging.error(f"HTTP error occurred: {http_err}")
+            elevations.extend(['N/A'] * len(chunk))
+        except Exception as e:
+            logging.error(f"Error fetching elevation data: {e}")
+            elevations.extend(['N/A'] * len(chunk))
+    return elevations
+
 def get_elevation(lat, lon, update_status, status_var, root):
     logging.debug(f"get_elevation called with lat: {lat}, lon: {lon}")
-    try:
-        query_elevation = f"https://api.opentopodata.org/v1/ned10m?locations={lat},{lon}"
-        update_status("Fetching elevation data...", status_var, root)
-
-        while True:
-            logging.debug(f"Requesting elevation data for lat: {lat}, lon: {lon}")
-            response_elevation = requests.get(query_elevation)
-            logging.debug(f"Response status code: {response_elevation.status_code}")
-            if response_elevation.status_code == 200:
-                break
-            elif response_elevation.status_code == 429:
-                retry_after = int(response_elevation.headers.get('Retry-After', 1.5))  # Default to retry after 1.5 second
-                update_status(f"Elevation data timeout, retrying in {retry_after} second(s)...", status_var, root)
-                time.sleep(retry_after)
-            else:
-                response_elevation.raise_for_status()  # Raise for other errors
-
-        elevation_data = response_elevation.json()
-        if elevation_data['results'][0]['elevation'] is not None:
-            elevation = round(elevation_data['results'][0]['elevation'], 1)
-            logging.debug(f"Elevation data fetched: {elevation}")
-        else:
-            elevation = 'N/A'
-        
-        # Update GUI in the main thread
-        root.after(0, lambda: update_status("Elevation Data Gathered, press a key to continue...", status_var, root))
-
-        # Adding a 5-second delay after fetching the elevation data
-        logging.debug("Elevation request successful")
-        return elevation
-
-    except requests.exceptions.HTTPError as http_err:
-        logging.error(f"HTTP error occurred: {http_err}")
-        return 'N/A'
-    except Exception as e:
-        logging.error(f"Error fetching elevation data: {e}")
-        return 'N/A'
+    elevation = get_elevations([(lat, lon)], update_status, status_var, root)[0]
+    logging.debug(f"Elevation data fetched: {elevation}")
+
+    update_status("Elevation Data Gathered", status_var, root)
+    return elevation
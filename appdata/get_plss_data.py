@@ -1,15 +1,53 @@
-import time
 from shapely.geometry import Point
 import requests
 import logging
 
+from rate_limiter import limited_get
+from lookup_settings import PLSS_PROVIDER
+from cache_keys import cache_key
+from polygon_cache import polygon_cache, esri_rings_to_shape
+
+def parse_plss_attributes(attributes):
+    # Turn CadNSDI PRINMER/TWNSHPLAB/FRSTDIVNO/QSEC/QQSEC attributes into the PLSS result dict
+    if not attributes:
+        return {
+            'Principle Meridian': 'N/A',
+            'Township': 'N/A',
+            'Range': 'N/A',
+            'Section': 'N/A',
+            'Quarter Section': 'N/A',
+            'Quarter Quarter Section': 'N/A'
+        }
+
+    plss_info = {}
+    plss_info['Principle Meridian'] = (attributes.get('PRINMER') or 'N/A').replace(' Meridian', '')
+    twshplab = attributes.get('TWNSHPLAB') or 'N/A'
+    if ' ' in twshplab:
+        township, rng = twshplab.split(' ', 1)
+    else:
+        township, rng = twshplab, 'N/A'
+    township = township.replace('T', '')
+    rng = rng.replace('R', '')
+    plss_info['Township'] = township
+    plss_info['Range'] = rng
+    plss_info['Section'] = attributes.get('FRSTDIVNO', 'N/A') or 'N/A'
+    quarter = attributes.get('QSEC', 'N/A')
+    qqsec = attributes.get('QQSEC', 'N/A')
+    if qqsec not in [None, '', 'N/A']:
+        plss_info['Quarter Quarter Section'] = qqsec
+    else:
+        plss_info['Quarter Quarter Section'] = 'N/A'
+    plss_info['Quarter Section'] = quarter if quarter else 'N/A'
+    return plss_info
+
 def get_plss_data(lat, lon, gdf, update_status, status_var, root, query_cache):
     logging.debug(f"get_plss_data called with lat: {lat}, lon: {lon}")
     try:
         update_status("Fetching PLSS data...", status_var, root)
 
-        if (lat, lon) in query_cache:
-            cached_data = query_cache[(lat, lon)]
+        key = cache_key("plss", lat, lon)
+        if key in query_cache:
+            cached_data = query_cache[key]
             logging.debug(f"Using cached PLSS data: {cached_data}")
             return cached_data
 
@@ -28,43 +66,21 @@ def get_plss_data(lat, lon, gdf, update_status, status_var, root, query_cache):
                     "&inSR=4326"
                     "&spatialRel=esriSpatialRelIntersects"
                     f"&outFields={fields}"
+                    "&returnGeometry=true"
+                    "&outSR=4326"
                     "&f=json"
                 )
-                response = requests.get(query_url)
+                response = limited_get(query_url)
                 response.raise_for_status()
                 data = response.json()
 
-                plss_info = {}
                 if data.get('features'):
-                    attributes = data['features'][0]['attributes']
-                    plss_info['Principle Meridian'] = attributes.get('PRINMER', 'N/A').replace(' Meridian', '')
-                    twshplab = attributes.get('TWNSHPLAB', 'N/A')
-                    if ' ' in twshplab:
-                        township, rng = twshplab.split(' ', 1)
-                    else:
-                        township, rng = twshplab, 'N/A'
-                    township = township.replace('T', '')
-                    rng = rng.replace('R', '')
-                    plss_info['Township'] = township
-                    plss_info['Range'] = rng
-                    plss_info['Section'] = attributes.get('FRSTDIVNO', 'N/A') or 'N/A'
-                    quarter = attributes.get('QSEC', 'N/A')
-                    qqsec = attributes.get('QQSEC', 'N/A')
-                    if qqsec not in [None, '', 'N/A']:
-                        plss_info['Quarter Quarter Section'] = qqsec
-                    else:
-                        plss_info['Quarter Quarter Section'] = 'N/A'
-                    plss_info['Quarter Section'] = quarter if quarter else 'N/A'
+                    feature = data['features'][0]
+                    plss_info = parse_plss_attributes(feature['attributes'])
+                    # Every point in this quarter-quarter section has the same answer
+                    polygon_cache.remember("plss", esri_rings_to_shape(feature.get('geometry')), plss_info)
                 else:
-                    plss_info = {
-                        'Principle Meridian': 'N/A',
-                        'Township': 'N/A',
-                        'Range': 'N/A',
-                        'Section': 'N/A',
-                        'Quarter Section': 'N/A',
-                        'Quarter Quarter Section': 'N/A'
-                    }
-                time.sleep(0.25)
+                    plss_info = parse_plss_attributes(None)
                 logging.debug(f"PLSS data fetched: {plss_info}")
                 return plss_info
 
@@ -75,8 +91,17 @@ def get_plss_data(lat, lon, gdf, update_status, status_var, root, query_cache):
                 logging.error(f"Error fetching PLSS data: {e}")
                 return None
 
-        plss_info = fetch_plss_online(lat, lon)
-        query_cache[(lat, lon)] = plss_info
+        # gdf is a local PlssIndex when one has been loaded
+        if gdf is None and PLSS_PROVIDER == "local":
+            from plss_index import load_plss_index
+            gdf = load_plss_index()
+
+        if gdf is not None:
+            logging.debug(f"Looking up PLSS data locally for lat: {lat}, lon: {lon}")
+            plss_info = gdf.lookup_point(point)
+        else:
+            plss_info = polygon_cache.lookup("plss", lat, lon) or fetch_plss_online(lat, lon)
+        query_cache[key] = plss_info
         logging.debug(f"Returning PLSS data: {plss_info}")
         return plss_info
 
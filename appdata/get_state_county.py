@@ -1,12 +1,35 @@
 import requests
 import logging
 
+from rate_limiter import limited_get
+from lookup_settings import STATE_COUNTY_PROVIDER
+
+# States with no Public Land Survey System: the original 13 colonies and the
+# states formed from them or never surveyed under the PLSS
+NON_PLSS_STATES = {
+    "Connecticut", "Delaware", "Georgia", "Maryland", "Massachusetts", "New Hampshire",
+    "New Jersey", "New York", "North Carolina", "Pennsylvania", "Rhode Island",
+    "South Carolina", "Virginia",
+    "District of Columbia", "Hawaii", "Kentucky", "Maine", "Tennessee", "Texas",
+    "Vermont", "West Virginia",
+}
+
+def is_plss_state(state):
+    # Unknown states still get a PLSS lookup
+    return state not in NON_PLSS_STATES
+
 def get_state_county(lat, lon):
     logging.debug(f"get_state_county called with lat: {lat}, lon: {lon}")
     try:
+        if STATE_COUNTY_PROVIDER == "local":
+            from county_index import load_county_index
+            state, county = load_county_index().lookup(lat, lon)
+            logging.debug(f"State: {state}, County: {county} (local)")
+            return state, county
+
         query = f"https://geo.fcc.gov/api/census/block/find?latitude={lat}&longitude={lon}&format=json"
         logging.debug("Fetching state and county data...")
-        response = requests.get(query)
+        response = limited_get(query)
         response.raise_for_status()
 
         data = response.json()
@@ -21,3 +44,15 @@ def get_state_county(lat, lon):
     except Exception as e:
         logging.error(f"Error fetching state and county data: {e}")
         return None, None
+
+def get_states_counties(points):
+    # Bulk version of get_state_county, one (state, county) per (lat, lon) point
+    points = list(points)
+    if STATE_COUNTY_PROVIDER == "local":
+        from county_index import load_county_index
+        try:
+            return load_county_index().lookup_many([lat for lat, _ in points], [lon for _, lon in points])
+        except Exception as e:
+            logging.error(f"Error looking up state and county data locally: {e}")
+            return [(None, None)] * len(points)
+    return [get_state_county(lat, lon) for lat, lon in points]
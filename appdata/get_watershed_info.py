@@ -1,54 +1,144 @@
 import requests
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-def get_watershed_info(lat, lon, update_status, status_var, root):
+from rate_limiter import limited_get
+from http_session import call_with_deadline, current_deadline
+from huc_names import get_huc_name, remember_huc_name
+from polygon_cache import polygon_cache, esri_rings_to_shape
+from lookup_settings import WATERSHED_MODE, WATERSHED_PROVIDER
+
+base_url = "https://hydro.nationalmap.gov/arcgis/rest/services/wbd/MapServer"
+
+# (layer, name, result key, code field, code length)
+layers = [
+    (1, "HUC2", "Region", "huc2", 2),
+    (2, "HUC4", "Subregion", "huc4", 4),
+    (3, "HUC6", "Sub-Basin", "huc6", 6),
+    (4, "HUC8", "Watershed", "huc8", 8),
+    (5, "HUC10", "Sub-Watershed", "huc10", 10),
+    (6, "HUC12", "Catchment", "huc12", 12),
+]
+
+def fetch_feature(layer, lat, lon, return_geometry=False):
+    logging.debug(f"Fetching data for layer {layer}...")
+    url = f"{base_url}/{layer}/query"
+    params = {
+        'f': 'json',
+        'geometry': f'{lon},{lat}',
+        'geometryType': 'esriGeometryPoint',
+        'inSR': '4326',
+        'spatialRel': 'esriSpatialRelIntersects',
+        'outFields': '*',
+        'returnGeometry': 'true' if return_geometry else 'false',
+        'outSR': '4326'
+    }
+    response = limited_get(url, params=params)
+    logging.debug(f"Response status code: {response.status_code}")
+    # A failed request raises, so it is never mistaken for a point outside
+    # every watershed (None) and cached as one
+    response.raise_for_status()
+    data = response.json()
+    if 'features' in data and len(data['features']) > 0:
+        logging.debug(f"Data fetched for layer {layer}: {data['features'][0]['attributes']}")
+        return data['features'][0]
+    return None
+
+def fetch_data(layer, lat, lon):
+    feature = fetch_feature(layer, lat, lon)
+    return feature['attributes'] if feature else None
+
+def fetch_layers(lat, lon, wanted):
+    # Query the requested layers concurrently, returns {layer: attributes},
+    # None for a layer with no feature at the point or whose request failed.
+    # Raises when a request failed and no layer has a feature, so a failure
+    # is never mistaken for a point outside every watershed
+    # The layer threads keep the deadline of the lookup they work for
+    deadline = current_deadline()
+    with ThreadPoolExecutor(max_workers=len(wanted)) as executor:
+        futures = {
+            layer: executor.submit(call_with_deadline, deadline, fetch_data, layer, lat, lon) for layer in wanted
+        }
+        data = {}
+        error = None
+        for layer, future in futures.items():
+            try:
+                data[layer] = future.result()
+            except Exception as e:
+                logging.error(f"Error fetching watershed layer {layer}: {e}")
+                data[layer] = None
+                error = e
+        if error is not None and not any(data.values()):
+            raise error
+        return data
+
+def parent_huc_names(code):
+    # Every parent HUC code is a prefix of the HUC12 code, look the names up
+    # in the local table ({layer: name or None})
+    return {layer: get_huc_name(code[:length]) for layer, _, _, _, length in layers[:-1]}
+
+def watershed_results(code, name, parent_names):
+    results = {}
+    for layer, _, key, _, _ in layers[:-1]:
+        results[key] = parent_names.get(layer) or 'Unknown'
+    results["Catchment"] = name or 'Unknown'
+    results["HUC12 Code"] = code
+    return results
+
+def watershed_parallel(lat, lon):
+    data = fetch_layers(lat, lon, [layer for layer, *_ in layers])
+    results = {}
+    for layer, name, key, code_field, _ in layers:
+        attributes = data[layer]
+        results[key] = attributes.get('name', 'Unknown') if attributes else 'Unknown'
+        if attributes:
+            remember_huc_name(attributes.get(code_field), attributes.get('name'))
+        if name == "HUC12":
+            results["HUC12 Code"] = attributes.get('huc12', 'Unknown') if attributes else 'Unknown'
+    return results
+
+def watershed_from_huc12(lat, lon):
+    feature = fetch_feature(6, lat, lon, return_geometry=True)
+    huc12 = feature['attributes'] if feature else None
+    if not huc12 or not huc12.get('huc12'):
+        logging.debug("No HUC12 hit, falling back to querying every layer...")
+        return watershed_parallel(lat, lon)
+
+    code = huc12['huc12']
+    remember_huc_name(code, huc12.get('name'))
+
+    names = parent_huc_names(code)
+    missing = [layer for layer, name in names.items() if name is None]
+
+    # Only ask the server for parents the name table does not know yet
+    if missing:
+        logging.debug(f"HUC names missing locally for layers {missing}, querying them...")
+        for layer, attributes in fetch_layers(lat, lon, missing).items():
+            if attributes:
+                code_field = layers[layer - 1][3]
+                names[layer] = attributes.get('name')
+                remember_huc_name(attributes.get(code_field), attributes.get('name'))
+
+    results = watershed_results(code, huc12.get('name'), names)
+    # Every point in this HUC12 has the same answer, unless a parent name is
+    # missing because its request failed
+    if all(name is not None for name in names.values()):
+        polygon_cache.remember("watershed", esri_rings_to_shape(feature.get('geometry')), results)
+    return results
+
+def get_watershed_info(lat, lon, update_status, status_var, root, mode=None):
     logging.debug(f"get_watershed_info called with lat: {lat}, lon: {lon}")
     try:
-        base_url = "https://hydro.nationalmap.gov/arcgis/rest/services/wbd/MapServer"
-
-        def fetch_data(layer, lat, lon):
-            logging.debug(f"Fetching data for layer {layer}...")
-            url = f"{base_url}/{layer}/query"
-            params = {
-                'f': 'json',
-                'geometry': f'{lon},{lat}',
-                'geometryType': 'esriGeometryPoint',
-                'inSR': '4326',
-                'spatialRel': 'esriSpatialRelIntersects',
-                'outFields': '*',
-                'returnGeometry': 'false'
-            }
-            response = requests.get(url, params=params)
-            logging.debug(f"Response status code: {response.status_code}")
-            if response.status_code == 200:
-                data = response.json()
-                if 'features' in data and len(data['features']) > 0:
-                    logging.debug(f"Data fetched for layer {layer}: {data['features'][0]['attributes']}")
-                    return data['features'][0]['attributes']
-            return None
-
-        layers = [(1, "HUC2"), (2, "HUC4"), (3, "HUC6"), (4, "HUC8"), (5, "HUC10"), (6, "HUC12")]
-        results = {}
-        
-        for layer, name in layers:
-            update_status(f"Fetching {name} watershed data...", status_var, root)
-            data = fetch_data(layer, lat, lon)
-            logging.debug(f"Pausing for .1 seconds after {name}...")
-            time.sleep(.1)
-            if name == "HUC2":
-                results["Region"] = data.get('name', 'Unknown') if data else 'Unknown'
-            elif name == "HUC4":
-                results["Subregion"] = data.get('name', 'Unknown') if data else 'Unknown'
-            elif name == "HUC6":
-                results["Sub-Basin"] = data.get('name', 'Unknown') if data else 'Unknown'
-            elif name == "HUC8":
-                results["Watershed"] = data.get('name', 'Unknown') if data else 'Unknown'
-            elif name == "HUC10":
-                results["Sub-Watershed"] = data.get('name', 'Unknown') if data else 'Unknown'
-            elif name == "HUC12":
-                results["Catchment"] = data.get('name', 'Unknown') if data else 'Unknown'
-                results["HUC12 Code"] = data.get('huc12', 'Unknown') if data else 'Unknown'
+        mode = mode or WATERSHED_MODE
+        update_status("Fetching watershed data...", status_var, root)
+
+        if WATERSHED_PROVIDER == "local":
+            from wbd_index import load_wbd_index
+            results = load_wbd_index().lookup(lat, lon)
+        elif mode == "parallel":
+            results = watershed_parallel(lat, lon)
+        else:
+            results = polygon_cache.lookup("watershed", lat, lon) or watershed_from_huc12(lat, lon)
 
         logging.debug(f"Watershed info result: {results}")
         return results
@@ -0,0 +1,73 @@
+import threading
+import logging
+from queue import SimpleQueue
+
+from lookup_settings import GUI_FRAME_MS
+
+# The one way for worker threads to reach the GUI. Threads post calls and
+# variable values without touching Tk; the main loop applies them once every
+# GUI_FRAME_MS. Only the newest value of each variable is kept, so a burst
+# of status messages costs one redraw per frame, and frame callbacks (the
+# results table, the status log) run on the same tick.
+class GuiBridge:
+    def __init__(self, root, frame_ms=GUI_FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self._calls = SimpleQueue()
+        self._lock = threading.Lock()
+        self._values = {}  # Tcl variable name -> (variable, newest value)
+        self._frame_callbacks = []
+        root.after(frame_ms, self._frame)
+
+    def post(self, call, *args):
+        # call(*args) runs on the Tk thread at the next frame
+        self._calls.put((call, args))
+
+    def set_var(self, variable, value):
+        # variable.set(value) at the next frame, unless a newer value comes first
+        with self._lock:
+            self._values[str(variable)] = (variable, value)
+
+    def on_frame(self, callback):
+        self._frame_callbacks.append(callback)
+
+    def _run(self, call, *args):
+        try:
+            call(*args)
+        except Exception as e:
+            logging.error(f"Error updating the GUI: {e}")
+
+    def _frame(self):
+        # Only what was posted before this frame started, so a thread posting
+        # in a tight loop cannot keep the main loop from drawing
+        for _ in range(self._calls.qsize()):
+            call, args = self._calls.get_nowait()
+            self._run(call, *args)
+        with self._lock:
+            values, self._values = self._values, {}
+        for variable, value in values.values():
+            self._run(variable.set, value)
+        for callback in self._frame_callbacks:
+            self._run(callback)
+        self.root.after(self.frame_ms, self._frame)
+
+_bridge = None
+_bridge_lock = threading.Lock()
+
+def start_gui_bridge(root):
+    global _bridge
+    with _bridge_lock:
+        _bridge = GuiBridge(root)
+        return _bridge
+
+def get_gui_bridge():
+    # None when no GUI is running (CLI, tests)
+    return _bridge
+
+def call_in_gui(call, *args):
+    # Runs call(*args) now on the Tk thread or without a GUI, otherwise
+    # posts it to the bridge
+    if _bridge is None or threading.current_thread() is threading.main_thread():
+        call(*args)
+    else:
+        _bridge.post(call, *args)
@@ -0,0 +1,62 @@
+import time
+import random
+import threading
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from lookup_settings import HTTP_POOL_SIZE, HTTP_POOL_HOSTS, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX
+
+# One requests.Session shared by every provider, so repeated queries to the
+# same host reuse a kept-alive connection instead of a new TCP+TLS handshake.
+# Retries are done by rate_limiter.limited_get, not by urllib3, so every
+# retry is also paced by the host's rate limiter.
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            logging.debug(f"Created HTTP session with {HTTP_POOL_SIZE} connections per host")
+            _session = session
+        return _session
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+# Deadline (a time.monotonic() value) of the lookup the current thread works
+# for. Requests, retries and rate limiter waits stop at it, so a provider call
+# its caller has given up on does not keep holding a pool thread.
+_deadline = threading.local()
+
+def call_with_deadline(deadline, call, *args):
+    # call(*args) with its HTTP requests bounded by deadline (None for none)
+    previous = getattr(_deadline, "value", None)
+    _deadline.value = deadline
+    try:
+        return call(*args)
+    finally:
+        _deadline.value = previous
+
+def current_deadline():
+    return getattr(_deadline, "value", None)
+
+def time_left(deadline):
+    # Seconds until deadline, None without one
+    return None if deadline is None else deadline - time.monotonic()
+
+def backoff_delay(attempt):
+    # Exponential backoff with full jitter, so workers that failed together
+    # do not all retry at the same moment
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
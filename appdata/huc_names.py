@@ -0,0 +1,57 @@
+import csv
+import os
+import threading
+import logging
+
+from lookup_settings import HUC_NAMES_PATH, LEARNED_HUC_NAMES_PATH
+
+# Local table of WBD hydrologic unit names keyed by HUC code ("17", "1709", ...):
+# an optional user supplied table (HUC_NAMES_PATH), then the names learned in
+# earlier sessions. Both files may be missing, the table then starts empty.
+_huc_names = None
+_huc_names_lock = threading.Lock()
+
+def read_huc_names(path, names):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8', newline='') as csvfile:
+            for row in csv.reader(csvfile):
+                if len(row) >= 2 and row[0] != 'huc':
+                    names[row[0]] = row[1]
+
+def load_huc_names(paths=(HUC_NAMES_PATH, LEARNED_HUC_NAMES_PATH)):
+    global _huc_names
+    with _huc_names_lock:
+        if _huc_names is None:
+            _huc_names = {}
+            for path in paths:
+                read_huc_names(path, _huc_names)
+            logging.debug(f"Loaded {len(_huc_names)} HUC names from {', '.join(paths)}")
+        return _huc_names
+
+def get_huc_name(huc):
+    return load_huc_names().get(huc)
+
+def remember_huc_name(huc, name, path=LEARNED_HUC_NAMES_PATH):
+    if not huc or not name:
+        return
+    names = load_huc_names()
+    with _huc_names_lock:
+        if names.get(huc) == name:
+            return
+        names[huc] = name
+        # Append so the next session can name this unit without a request
+        try:
+            new_file = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8', newline='') as csvfile:
+                csv_writer = csv.writer(csvfile)
+                if new_file:
+                    csv_writer.writerow(['huc', 'name'])
+                csv_writer.writerow([huc, name])
+        except OSError as e:
+            logging.error(f"Could not save HUC name {huc}: {e}")
+
+def add_huc_names(names_by_huc):
+    # Bulk in-memory update, e.g. from local WBD layers that are already on disk
+    names = load_huc_names()
+    with _huc_names_lock:
+        names.update(names_by_huc)
@@ -1,119 +1,133 @@
-import csv
-import time
+import os
+import hashlib
 import threading
+import logging
 from tkinter import filedialog, messagebox
-from queue import Queue
 
-from get_elevation import get_elevation
-from get_state_county import get_state_county
+from gui_bridge import call_in_gui
+from async_engine import enrich_in_background
+from batch_checkpoint import BatchCheckpoint
+from ingest_points import ingest_points, count_rows
+from lookup_scheduler import get_lookup_scheduler
+from lookup_settings import IMPORT_CHECKPOINT_DIR
 
-# Worker function to process each record in the queue
-def worker(
-    queue,
+# Checkpoints of the imports still running, closed when the app exits
+_open_checkpoints = set()
+_checkpoints_lock = threading.Lock()
+
+def import_checkpoint_path(file_path):
+    # One checkpoint per input file, named after its absolute path
+    digest = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(IMPORT_CHECKPOINT_DIR, f"{name}_{digest}.sqlite3")
+
+def open_import_checkpoint(file_path):
+    os.makedirs(IMPORT_CHECKPOINT_DIR, exist_ok=True)
+    checkpoint = BatchCheckpoint(import_checkpoint_path(file_path))
+    with _checkpoints_lock:
+        _open_checkpoints.add(checkpoint)
+    return checkpoint
+
+def finish_import_checkpoint(checkpoint, remove):
+    # remove once every row is done; otherwise keep it to resume from
+    with _checkpoints_lock:
+        _open_checkpoints.discard(checkpoint)
+    if remove:
+        checkpoint.remove()
+    else:
+        checkpoint.close()
+
+def close_import_checkpoints():
+    # Saves what the imports still running have looked up so far
+    with _checkpoints_lock:
+        checkpoints = list(_open_checkpoints)
+    for checkpoint in checkpoints:
+        finish_import_checkpoint(checkpoint, remove=False)
+
+# Main function to handle CSV import
+def import_from_csv(
     import_callback,
     update_status,
     status_var,
     root,
     progress_var,
-    processed_counter,  # now an IntVar
-    total_records
+    processed_counter,  # Now we expect an IntVar from the caller
+    gdf=None,           # local PLSS index, if loaded
+    query_cache=None
 ):
-    while True:
-        item = queue.get()
-        if item is None:
-            break  # Exit if a 'None' item is encountered
-        label, lat, lon = item
-        # Process the record using the provided callback function
-        import_callback(lat, lon, label, progress_var, processed_counter, total_records, update_status, status_var, root)
-        time.sleep(6)
-        root.after(0, root.update_idletasks)
-        queue.task_done()
-
-# Callback function to process each record
-def import_callback(
-    lat, lon, label,
-    progress_var,
-    processed_counter,  # IntVar
-    total_records,
-    update_status,
-    status_var,
-    root
-):
-    # Example usage of some existing functions:
-    elevation = get_elevation(lat, lon, update_status, status_var, root)
-    state, county = get_state_county(lat, lon)
-
-    # Increment the IntVar-based counter instead of processed_counter[0]
-    current_value = processed_counter.get()
-    processed_counter.set(current_value + 1)
-
-    # Update the GUI with the progress
-    root.after(
-        0,
-        lambda: progress_var.set(
-            f"Processed {processed_counter.get()} of {total_records} records"
-        )
-    )
-    root.after(0, root.update_idletasks)
-
-    # Debug print or handle the fetched data
-    print(
-        f"Label: {label}, Latitude: {lat}, Longitude: {lon}, "
-        f"Elevation: {elevation}, State: {state}, County: {county}"
-    )
+    try:
+        file_path = filedialog.askopenfilename(filetypes=[
+            ("Point files", "*.csv *.parquet *.geoparquet *.gpkg *.shp *.zip *.geojson"),
+            ("CSV files", "*.csv"),
+            ("Parquet files", "*.parquet *.geoparquet"),
+            ("GeoPackage files", "*.gpkg"),
+            ("Shapefiles", "*.shp *.zip"),
+        ])
+        if file_path:
+            # Reset or initialize processed_counter to 0
+            processed_counter.set(0)
+            update_status(f"Counting records in {os.path.basename(file_path)}...", status_var, root)
 
-# Main function to handle CSV import
-def import_from_csv(
+            # Counting reads the whole file, so it runs on a worker thread
+            # and the engine is started from there
+            threading.Thread(
+                target=start_import,
+                args=(file_path, import_callback, update_status, status_var, root,
+                      progress_var, processed_counter, gdf, query_cache),
+                name="import", daemon=True
+            ).start()
+
+    except Exception as e:
+        messagebox.showerror("Import Error", f"An error occurred while importing data: {e}")
+
+def start_import(
+    file_path,
     import_callback,
     update_status,
     status_var,
     root,
     progress_var,
-    processed_counter  # Now we expect an IntVar from the caller
+    processed_counter,
+    gdf,
+    query_cache
 ):
     try:
-        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
-        if file_path:
-            with open(file_path, 'r', encoding='utf-8') as csvfile:
-                csv_reader = csv.reader(csvfile, delimiter=',')
-                next(csv_reader)  # Skip header row
-
-                # Convert all rows to a list for length
-                records = list(csv_reader)
-                total_records = len(records)
-
-                # Reset or initialize processed_counter to 0
-                processed_counter.set(0)
-
-                update_status(f"Processing {total_records} records...", status_var, root)
-                progress_var.set(f"Processed 0 of {total_records} records")
-
-                # Create a queue for the records
-                record_queue = Queue()
-                # Start the worker thread
-                threading.Thread(
-                    target=worker,
-                    args=(
-                        record_queue,
-                        import_callback,
-                        update_status,
-                        status_var,
-                        root,
-                        progress_var,
-                        processed_counter,
-                        total_records
-                    ),
-                    daemon=True
-                ).start()
-
-                # Enqueue each CSV row
-                for row in records:
-                    try:
-                        label, lat, lon = row[0], float(row[1]), float(row[2])
-                        record_queue.put((label, lat, lon))
-                    except (ValueError, IndexError):
-                        # Skip rows that do not have the correct format
-                        continue
+        # Count the rows without keeping them in memory
+        total_records = count_rows(file_path)
+
+        update_status(f"Processing {total_records} records...", status_var, root)
+        call_in_gui(progress_var.set, f"Processed 0 of {total_records} records")
+
+        # Every provider answer is journaled by row, so importing the same
+        # file again after the app was closed midway skips what finished
+        checkpoint = open_import_checkpoint(file_path)
+        # The rows show up in the scheduler's queued/running/done status line
+        progress = get_lookup_scheduler().track_batch(total_records)
+
+        def on_result(result):
+            import_callback(result, progress_var, processed_counter, total_records, update_status, status_var, root)
+
+        def on_finished(job):
+            # The checkpoint is only deleted once every row was looked up
+            progress.close()
+            try:
+                imported = job.result()
+            except Exception as e:
+                logging.error(f"Error importing {file_path}: {e}")
+                finish_import_checkpoint(checkpoint, remove=False)
+                return
+            finish_import_checkpoint(checkpoint, remove=True)
+            logging.info(f"Imported {imported} records from {file_path}")
+
+        # The rows are streamed from the file through the asyncio engine on
+        # its loop thread, hundreds of lookups in flight at once
+        enrich_in_background(
+            ingest_points(file_path), on_result,
+            query_cache=query_cache, gdf=gdf,
+            update_status=update_status, status_var=status_var, root=root,
+            checkpoint=checkpoint, progress=progress
+        ).add_done_callback(on_finished)
 
     except Exception as e:
-        messagebox.showerror("Import Error", f"An error occurred while importing data: {e}")
+        logging.error(f"Error importing {file_path}: {e}")
+        call_in_gui(messagebox.showerror, "Import Error", f"An error occurred while importing data: {e}")
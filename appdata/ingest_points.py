@@ -0,0 +1,223 @@
+import os
+import csv
+import logging
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from utm_batch import utm_to_latlon_batch
+from lookup_settings import INGEST_CHUNK_SIZE
+
+# Bulk point readers for CSV, Parquet/GeoParquet and any vector format
+# pyogrio can open (GeoPackage, Shapefile, zipped Shapefile, GeoJSON).
+# Every format is streamed in chunks of INGEST_CHUNK_SIZE rows, and every
+# chunk is parsed and validated with whole-column operations. Rows that cannot be used are written to a
+# rejects file with the reason instead of being dropped silently.
+
+# Column names recognised when no mapping is given (case-insensitive)
+COLUMN_NAMES = {
+    "label": ("label", "name", "id", "site", "point"),
+    "lat": ("lat", "latitude", "y"),
+    "lon": ("lon", "long", "longitude", "lng", "x"),
+    "zone": ("zone", "utm_zone", "utm zone"),
+    "easting": ("easting", "utm_easting", "utm easting", "east"),
+    "northing": ("northing", "utm_northing", "utm northing", "north"),
+}
+
+GEOSPATIAL_EXTENSIONS = (".gpkg", ".shp", ".zip", ".geojson", ".json", ".fgb")
+
+def resolve_columns(columns, mapping=None):
+    # Map each role (label, lat, lon, zone, easting, northing) to a column
+    # of the file. Roles given in mapping win; the rest are looked up by name.
+    mapping = {role: name for role, name in (mapping or {}).items() if name}
+    missing = [name for name in mapping.values() if name not in columns]
+    if missing:
+        raise ValueError(f"column(s) not found: {', '.join(missing)}; the file has {', '.join(map(str, columns))}")
+    by_name = {str(column).strip().lower(): column for column in columns}
+    resolved = dict(mapping)
+    # Mapping UTM columns means the lat/lon guesses are not wanted, and the
+    # other way round
+    skip = set()
+    if {"zone", "easting", "northing"} & set(mapping):
+        skip |= {"lat", "lon"}
+    if {"lat", "lon"} & set(mapping):
+        skip |= {"zone", "easting", "northing"}
+    for role, names in COLUMN_NAMES.items():
+        if role in resolved or role in skip:
+            continue
+        for name in names:
+            if name in by_name:
+                resolved[role] = by_name[name]
+                break
+    return resolved
+
+def coordinate_columns(columns, mapping=None):
+    # Roles for the columns of a file, falling back to label, lat, lon by
+    # position when the names say nothing
+    resolved = resolve_columns(columns, mapping)
+    has_coordinates = {"lat", "lon"} <= set(resolved) or {"zone", "easting", "northing"} <= set(resolved)
+    if not has_coordinates and "geometry" not in columns and len(columns) >= 3:
+        resolved = {"label": columns[0], "lat": columns[1], "lon": columns[2]}
+    return resolved
+
+def geo_frame(table, geometry_column, crs):
+    # GeoDataFrame of an Arrow table whose geometry column holds WKB
+    import geopandas as gpd
+    df = table.select([name for name in table.column_names if name != geometry_column]).to_pandas()
+    geometry = shapely.from_wkb(table.column(geometry_column).to_numpy())
+    return gpd.GeoDataFrame(df, geometry=gpd.GeoSeries(geometry, index=df.index, crs=crs), crs=crs)
+
+def geoparquet_crs(column):
+    # GeoParquet stores PROJJSON; a missing crs means OGC:CRS84 (lon/lat)
+    from pyproj import CRS
+    if "crs" not in column:
+        return CRS("OGC:CRS84")
+    return CRS.from_json_dict(column["crs"]) if column["crs"] is not None else None
+
+def read_chunks(path, chunk_size=INGEST_CHUNK_SIZE, mapping=None):
+    # Yields DataFrames of at most chunk_size rows. In text files only the
+    # coordinate columns are parsed as numbers (by the C parser); the rest,
+    # labels included, stay text so e.g. leading zeros survive.
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".csv", ".txt"):
+        options = dict(encoding="utf-8-sig", skipinitialspace=True)
+        columns = list(pd.read_csv(path, nrows=0, **options).columns)
+        roles = coordinate_columns(columns, mapping)
+        numeric = {roles.get(role) for role in ("lat", "lon", "easting", "northing")}
+        dtype = {column: str for column in columns if column not in numeric}
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=dtype, **options)
+    elif extension in (".parquet", ".geoparquet"):
+        import json
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        geo = (parquet_file.schema_arrow.metadata or {}).get(b"geo")
+        geometry_column = None
+        if geo is not None:
+            geo = json.loads(geo)
+            geometry_column = geo.get("primary_column", "geometry")
+            column = geo.get("columns", {}).get(geometry_column, {})
+            if column.get("encoding", "WKB").upper() != "WKB":
+                # Native GeoArrow encodings are left to geopandas, read whole
+                import geopandas as gpd
+                logging.debug(f"{path} uses {column['encoding']} geometries, reading it in one go")
+                yield gpd.read_parquet(path)
+                return
+            crs = geoparquet_crs(column)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            if geometry_column is None:
+                yield batch.to_pandas()
+            else:
+                yield geo_frame(pa.Table.from_batches([batch]), geometry_column, crs)
+    elif extension in GEOSPATIAL_EXTENSIONS:
+        import pyarrow as pa
+        import pyogrio
+        with pyogrio.open_arrow(path, batch_size=chunk_size, use_pyarrow=True) as (meta, reader):
+            geometry_column = meta["geometry_name"] or "wkb_geometry"
+            for batch in reader:
+                yield geo_frame(pa.Table.from_batches([batch]), geometry_column, meta["crs"])
+    else:
+        raise ValueError(f"unsupported input file type: {extension or path}")
+
+def count_rows(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".csv", ".txt"):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as csvfile:
+            return max(0, sum(1 for _ in csv.reader(csvfile)) - 1)
+    if extension in (".parquet", ".geoparquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if extension in GEOSPATIAL_EXTENSIONS:
+        # From the layer metadata; formats without a stored count (GeoJSON)
+        # are counted by GDAL without building any geometries
+        import pyogrio
+        return max(0, pyogrio.read_info(path, force_feature_count=True)["features"])
+    raise ValueError(f"unsupported input file type: {extension or path}")
+
+def parse_numbers(values):
+    # Text that is not a number becomes NaN
+    if not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).str.strip()
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+
+def parse_chunk(df, columns, first_row):
+    # Returns (points, rejects): points has label, lat, lon columns, rejects
+    # the unusable input rows with a row number and a reason
+    rows = np.arange(first_row, first_row + len(df))
+    reasons = np.full(len(df), "", dtype=object)
+
+    if "label" in columns:
+        # Blank labels stay blank rather than turning into "nan"
+        labels = df[columns["label"]].fillna("").astype(str).to_numpy()
+    else:
+        labels = rows.astype(str)
+
+    if "lat" in columns and "lon" in columns:
+        lats = parse_numbers(df[columns["lat"]])
+        lons = parse_numbers(df[columns["lon"]])
+        reasons[~np.isfinite(lats) | ~np.isfinite(lons)] = "latitude/longitude is not a number"
+        out_of_range = np.isfinite(lats) & np.isfinite(lons) & ((np.abs(lats) > 90) | (np.abs(lons) > 180))
+        reasons[out_of_range] = "latitude/longitude out of range"
+    elif {"zone", "easting", "northing"} <= set(columns):
+        # Zones may carry a latitude band letter (12T, 56H); without one
+        # the point is taken as northern
+        zone_parts = df[columns["zone"]].astype(str).str.strip().str.upper().str.extract(r"^(\d{1,2})([C-HJ-NP-X]?)$")
+        zones = pd.to_numeric(zone_parts[0], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+        northern = (zone_parts[1].fillna("") == "") | (zone_parts[1].fillna("") >= "N")
+        eastings = parse_numbers(df[columns["easting"]])
+        northings = parse_numbers(df[columns["northing"]])
+        lats, lons, valid = utm_to_latlon_batch(zones, eastings, northings, northern.to_numpy())
+        reasons[~valid] = "invalid UTM zone/easting/northing"
+    elif hasattr(df, "geometry"):
+        geometry = df.geometry
+        if geometry.crs is not None and not geometry.crs.equals("EPSG:4326"):
+            geometry = geometry.to_crs("EPSG:4326")
+        shapes = geometry.to_numpy()
+        is_point = (geometry.geom_type == "Point").to_numpy() & ~geometry.is_empty.to_numpy()
+        lats = np.where(is_point, shapely.get_y(shapes), np.nan)
+        lons = np.where(is_point, shapely.get_x(shapes), np.nan)
+        reasons[~is_point] = "geometry is not a point"
+    else:
+        raise ValueError("no latitude/longitude, UTM or point geometry columns found")
+
+    bad = reasons != ""
+    points = pd.DataFrame({"label": labels[~bad], "lat": lats[~bad], "lon": lons[~bad]})
+    rejects = None
+    if bad.any():
+        rejects = pd.DataFrame({"row": rows[bad], "reason": reasons[bad]})
+        original = df.iloc[np.flatnonzero(bad)].drop(columns=["geometry"], errors="ignore").reset_index(drop=True)
+        rejects = pd.concat([rejects, original], axis=1)
+    return points, rejects
+
+def ingest_points(path, columns=None, rejects_path=None):
+    # Yields (label, lat, lon) for every usable row of the file. columns maps roles (label, lat, lon or zone, easting,
+    # northing) to column names. Rejected rows go to rejects_path, by
+    # default <input>_rejects.csv next to the input, created only when
+    # there is something to report. Row numbers count data rows from 1.
+    if rejects_path is None:
+        rejects_path = os.path.splitext(path)[0] + "_rejects.csv"
+
+    first_row = 1
+    accepted = rejected = 0
+    rejects_header = None
+    try:
+        for chunk in read_chunks(path, mapping=columns):
+            resolved = coordinate_columns(list(chunk.columns), columns)
+            points, rejects = parse_chunk(chunk, resolved, first_row)
+            first_row += len(chunk)
+            accepted += len(points)
+
+            if rejects is not None:
+                rejected += len(rejects)
+                if rejects_header is None:
+                    rejects_header = list(rejects.columns)
+                    rejects.to_csv(rejects_path, index=False)
+                else:
+                    rejects.reindex(columns=rejects_header).to_csv(rejects_path, mode="a", header=False, index=False)
+
+            yield from zip(points["label"].tolist(), points["lat"].tolist(), points["lon"].tolist())
+    finally:
+        if rejected:
+            logging.warning(f"Skipped {rejected} invalid row(s) of {path}, see {rejects_path}")
+        logging.info(f"Read {accepted} point(s) from {path}")
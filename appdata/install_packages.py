@@ -34,7 +34,10 @@ def main():
         'time',
         'shapely',
         'requests',
-        'pyarrow'
+        'pyarrow',
+        'pyogrio',
+        'numpy',
+        'rasterio'
     ]
 
     for package in packages:
@@ -0,0 +1,24 @@
+import logging
+from collections import deque
+
+from lookup_settings import LOG_BUFFER_SIZE
+
+# Logging handler that keeps the last LOG_BUFFER_SIZE formatted records in
+# memory. emit() only appends to a deque, so it is cheap from any thread;
+# the GUI reads the tail on a timer instead of redrawing per record.
+class RingBufferHandler(logging.Handler):
+    def __init__(self, size=LOG_BUFFER_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=size)
+        self.count = 0  # records seen, to tell whether anything is new
+
+    def emit(self, record):
+        try:
+            self.records.append(self.format(record))
+            self.count += 1
+        except Exception:
+            self.handleError(record)
+
+    def tail(self, lines):
+        records = self.records
+        return [records[i] for i in range(-min(lines, len(records)), 0)]
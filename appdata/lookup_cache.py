@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+
+from cache_keys import cache_key
+from single_flight import single_flight
+from providers import PROVIDERS
+from lookup_settings import CACHE_ENABLED, CACHE_PATH, CACHE_MAX_ENTRIES, CACHE_TTLS
+
+# Rows inserted between checks of the size bound
+EVICT_EVERY = 1000
+
+# Persistent provider results shared across sessions, in SQLite.
+# Entries expire after the provider's TTL and the least recently used
+# ones are evicted once the table grows past max_entries.
+class LookupCache:
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, ttls=CACHE_TTLS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.hits = {}
+        self.misses = {}
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " provider TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL,"
+            " PRIMARY KEY (provider, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self._conn.commit()
+
+    def get(self, provider, key):
+        # Returns the cached value, or None on a miss
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM cache WHERE provider = ? AND key = ?", (provider, key)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttls.get(provider, float('inf')):
+                self._conn.execute("DELETE FROM cache WHERE provider = ? AND key = ?", (provider, key))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses[provider] = self.misses.get(provider, 0) + 1
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed = ? WHERE provider = ? AND key = ?", (now, provider, key)
+            )
+            self._conn.commit()
+            self.hits[provider] = self.hits.get(provider, 0) + 1
+        return json.loads(row[0])
+
+    def set(self, provider, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (provider, key, value, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (provider, key, json.dumps(value), now, now)
+            )
+            self._inserts += 1
+            if self._inserts % EVICT_EVERY == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.max_entries:
+            logging.debug(f"Lookup cache has {count} entries, evicting {count - self.max_entries}")
+            self._conn.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def stats(self):
+        with self._lock:
+            providers = sorted(set(self.hits) | set(self.misses))
+            return {p: {"hits": self.hits.get(p, 0), "misses": self.misses.get(p, 0)} for p in providers}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_lookup_cache = None
+_lookup_cache_enabled = CACHE_ENABLED
+_lookup_cache_lock = threading.Lock()
+
+def get_lookup_cache():
+    # Shared cache, or None when caching is turned off or the file cannot be opened
+    global _lookup_cache
+    with _lookup_cache_lock:
+        if _lookup_cache is None and _lookup_cache_enabled:
+            try:
+                _lookup_cache = LookupCache()
+            except sqlite3.Error as e:
+                logging.error(f"Could not open lookup cache {CACHE_PATH}: {e}")
+                return None
+        return _lookup_cache
+
+def set_lookup_cache(cache):
+    # Swap in a different cache (e.g. another file), None turns caching off
+    global _lookup_cache, _lookup_cache_enabled
+    with _lookup_cache_lock:
+        _lookup_cache = cache
+        _lookup_cache_enabled = cache is not None
+
+def is_cached(provider):
+    # Providers without a cache lifetime are always asked directly
+    return provider in PROVIDERS and PROVIDERS[provider].cache_ttl is not None
+
+def is_cacheable(provider, value):
+    # Failed lookups are not kept (here or in a batch checkpoint) so they are
+    # retried next time
+    if provider in PROVIDERS:
+        return PROVIDERS[provider].is_cacheable(value)
+    return value is not None and value != 'N/A'
+
+def decode(provider, value):
+    return PROVIDERS[provider].decode(value) if provider in PROVIDERS else value
+
+def cached_lookup(provider, lat, lon, call):
+    key = cache_key(provider, lat, lon)
+    # Concurrent lookups that normalise to the same key share one call, so a
+    # repeated point does not go to the network again before the cache is filled
+    return single_flight.do((provider, key), lambda: cached_call(provider, key, call))
+
+def cached_call(provider, key, call):
+    cache = get_lookup_cache() if is_cached(provider) else None
+    if cache is None:
+        return call()
+    value = cache.get(provider, key)
+    if value is not None:
+        logging.debug(f"Using cached {provider} data for {key}")
+        return decode(provider, value)
+    value = call()
+    if is_cacheable(provider, value):
+        cache.set(provider, key, value)
+    return value
+
+def cached_batch_lookup(provider, points, batch_call):
+    # Like cached_lookup for a list of (lat, lon) points: only the misses
+    # are passed to batch_call, each key only once, and results come back
+    # in input order
+    points = list(points)
+    cache = get_lookup_cache() if is_cached(provider) else None
+    keys = [cache_key(provider, lat, lon) for lat, lon in points]
+
+    values = [None] * len(points)
+    missing = {}  # key -> indexes of the points that share it
+    for i, key in enumerate(keys):
+        value = cache.get(provider, key) if cache is not None else None
+        if value is not None:
+            values[i] = decode(provider, value)
+        else:
+            missing.setdefault(key, []).append(i)
+
+    if missing:
+        fetched = batch_call([points[indexes[0]] for indexes in missing.values()])
+        for (key, indexes), value in zip(missing.items(), fetched):
+            for i in indexes:
+                values[i] = value
+            if cache is not None and is_cacheable(provider, value):
+                cache.set(provider, key, value)
+    return values
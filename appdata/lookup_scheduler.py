@@ -0,0 +1,159 @@
+import threading
+import logging
+from queue import Queue
+
+from lookup_settings import SCHEDULER_WORKERS, SCHEDULER_MAX_QUEUED
+
+# Rows of a batch that runs outside the scheduler's workers (a GUI import on
+# the async engine), counted in the scheduler's queued/running/done totals.
+# The engine reports rows as it starts and writes them; close() drops
+# whatever is left when the batch ends early.
+class BatchProgress:
+    def __init__(self, scheduler, total):
+        self._scheduler = scheduler
+        self.queued = total
+        self.running = 0
+
+    def started(self, count):
+        self._scheduler._move_batch_rows(self, started=count)
+
+    def finished(self, count):
+        self._scheduler._move_batch_rows(self, finished=count)
+
+    def close(self):
+        self._scheduler._move_batch_rows(self, dropped=True)
+
+# Lookup scheduler shared by GUI submits and imports. Submitted lookups wait
+# in a queue and SCHEDULER_WORKERS of them run at once, so nothing is dropped
+# while another lookup is in flight. A submit for coordinates that are already
+# queued or running joins that job instead of starting another one. Imports
+# run on the async engine instead, hundreds of rows at once, and report their
+# rows through track_batch, so the status line counts both.
+class LookupScheduler:
+    def __init__(self, workers=SCHEDULER_WORKERS, max_queued=SCHEDULER_MAX_QUEUED):
+        self.max_queued = max_queued
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._room = threading.Condition(self._lock)
+        self._jobs = {}        # (lat, lon) -> on_done callbacks of every submit for it
+        self._running = set()  # keys of the jobs being run
+        self._listeners = []
+        self.queued = 0
+        self.running = 0
+        self.done = 0
+        # Batch rows are kept apart from queued, which throttles submits
+        self.batch_queued = 0
+        self.batch_running = 0
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"scheduler-{i}", daemon=True).start()
+
+    def add_listener(self, listener):
+        # listener(counts) is called from a worker thread whenever the counts change
+        self._listeners.append(listener)
+
+    def counts(self):
+        with self._lock:
+            return {
+                "queued": self.queued + self.batch_queued,
+                "running": self.running + self.batch_running,
+                "done": self.done
+            }
+
+    def track_batch(self, total):
+        # total rows of a batch run elsewhere, queued until it reports them
+        batch = BatchProgress(self, total)
+        with self._lock:
+            self.batch_queued += total
+        self._notify()
+        return batch
+
+    def _move_batch_rows(self, batch, started=0, finished=0, dropped=False):
+        with self._lock:
+            # The total can be short of the real row count, queued stops at zero
+            dequeued = min(started, batch.queued)
+            batch.queued -= dequeued
+            self.batch_queued -= dequeued
+            batch.running += started
+            self.batch_running += started
+            finished = min(finished, batch.running)
+            batch.running -= finished
+            self.batch_running -= finished
+            self.done += finished
+            if dropped:
+                self.batch_queued -= batch.queued
+                self.batch_running -= batch.running
+                batch.queued = batch.running = 0
+        self._notify()
+
+    def _notify(self):
+        counts = self.counts()
+        for listener in self._listeners:
+            try:
+                listener(counts)
+            except Exception as e:
+                logging.error(f"Error in scheduler listener: {e}")
+
+    def submit(self, lat, lon, run, on_done, wait=True):
+        # run() does the lookup; on_done(value) receives its return value, or
+        # None if it raised. With wait, blocks while max_queued lookups are
+        # queued, so a large import waits for the workers instead of queueing
+        # the whole file.
+        key = (float(lat), float(lon))
+        with self._lock:
+            while wait and self.queued >= self.max_queued:
+                self._room.wait()
+            callbacks = self._jobs.get(key)
+            if callbacks is not None:
+                logging.debug(f"Lookup for {key} already in flight, sharing its result")
+                callbacks.append(on_done)
+                if key in self._running:
+                    self.running += 1
+                else:
+                    self.queued += 1
+                new_job = False
+            else:
+                self._jobs[key] = [on_done]
+                self.queued += 1
+                new_job = True
+        self._notify()
+        if new_job:
+            self._queue.put((key, run))
+
+    def _work(self):
+        while True:
+            key, run = self._queue.get()
+            with self._lock:
+                submits = len(self._jobs[key])
+                self._running.add(key)
+                self.queued -= submits
+                self.running += submits
+                self._room.notify_all()
+            self._notify()
+
+            try:
+                value = run()
+            except Exception as e:
+                logging.error(f"Error in scheduled lookup for {key}: {e}")
+                value = None
+
+            with self._lock:
+                callbacks = self._jobs.pop(key)
+                self._running.discard(key)
+                self.running -= len(callbacks)
+                self.done += len(callbacks)
+            for on_done in callbacks:
+                try:
+                    on_done(value)
+                except Exception as e:
+                    logging.error(f"Error handling lookup result for {key}: {e}")
+            self._notify()
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_lookup_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LookupScheduler()
+        return _scheduler
@@ -0,0 +1,222 @@
+import os
+
+# Shared settings for the lookup providers
+
+# Seconds to wait for each provider before giving up on it for a point.
+# A provider that misses its deadline is reported as 'N/A' and the other
+# providers' results are still used.
+PROVIDER_TIMEOUTS = {
+    "elevation": 30,
+    "state_county": 15,
+    "watershed": 45,
+    "plss": 45,
+}
+
+# Extra provider modules to import at start-up, comma separated. Each one
+# calls providers.register_provider to add a provider or replace a built-in
+# one (see providers.py).
+PROVIDER_MODULES = [
+    name.strip() for name in os.environ.get("GEOLOOKUP_PROVIDER_MODULES", "").split(",") if name.strip()
+]
+
+# Lookups the GUI runs at once. Further submits and imported rows wait in a
+# queue of at most SCHEDULER_MAX_QUEUED lookups.
+SCHEDULER_WORKERS = 4
+SCHEDULER_MAX_QUEUED = 200
+
+# Threads shared by all per-point lookups (four providers per point)
+FAN_OUT_WORKERS = SCHEDULER_WORKERS * 4
+
+# Watershed lookup mode:
+#   "huc12"    - one HUC12 query; HUC2..HUC10 are derived from the HUC12 code
+#                prefix and named from the local HUC name tables. Parents the
+#                tables do not know yet are queried after the HUC12, so the
+#                first point in a new basin costs six requests, later ones one
+#   "parallel" - query all six WBD layers at once, six requests per point
+WATERSHED_MODE = "huc12"
+
+# Optional CSV of huc,name pairs used to name the parent HUCs in "huc12"
+# mode. No table ships with the source; without one the names come from
+# LEARNED_HUC_NAMES_PATH as the server answers. Only read, never written.
+HUC_NAMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "huc_names.csv")
+
+# opentopodata accepts up to 100 pipe-separated locations per request
+ELEVATION_BATCH_SIZE = 100
+
+# Elevation provider:
+#   "opentopodata" - the public opentopodata ned10m API
+#   "dem"          - local DEM GeoTIFF tiles in DEM_TILE_DIR (no network)
+ELEVATION_PROVIDER = os.environ.get("GEOLOOKUP_ELEVATION_PROVIDER", "opentopodata")
+
+# Folder of NED 1/3 arc-second GeoTIFF tiles for the "dem" provider
+DEM_TILE_DIR = os.environ.get("GEOLOOKUP_DEM_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dem"))
+
+# "bilinear" or "nearest" sampling of the DEM grid
+DEM_INTERPOLATION = "bilinear"
+
+# PLSS provider:
+#   "online" - the BLM CadNSDI MapServer
+#   "local"  - CadNSDI layers exported to GeoParquet, queried in-process
+PLSS_PROVIDER = os.environ.get("GEOLOOKUP_PLSS_PROVIDER", "online")
+
+# First division (section) polygons with PRINMER, TWNSHPLAB and FRSTDIVNO
+# columns, and quarter-quarter section polygons with QSEC and QQSEC columns
+PLSS_DIR = os.environ.get("GEOLOOKUP_PLSS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "plss"))
+PLSS_SECTIONS_PATH = os.path.join(PLSS_DIR, "first_division.parquet")
+PLSS_QQ_PATH = os.path.join(PLSS_DIR, "qq_section.parquet")
+
+# Watershed provider:
+#   "online" - hydro.nationalmap.gov WBD MapServer (see WATERSHED_MODE)
+#   "local"  - WBD HUC12 polygons exported to GeoParquet
+WATERSHED_PROVIDER = os.environ.get("GEOLOOKUP_WATERSHED_PROVIDER", "online")
+
+# huc12.parquet holds the HUC12 polygons (huc12, name columns). Optional
+# huc2.parquet .. huc10.parquet only supply the parent unit names.
+WBD_DIR = os.environ.get("GEOLOOKUP_WBD_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "wbd"))
+
+# State/county provider:
+#   "online" - the FCC census block API
+#   "local"  - a Census TIGER county boundary file (shapefile, zip or GeoParquet)
+STATE_COUNTY_PROVIDER = os.environ.get("GEOLOOKUP_STATE_COUNTY_PROVIDER", "online")
+
+# TIGER county file, e.g. tl_2023_us_county.zip. It is converted to GeoParquet
+# next to the source the first time it is loaded.
+COUNTY_BOUNDARY_PATH = os.environ.get(
+    "GEOLOOKUP_COUNTY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tiger", "tl_us_county.zip")
+)
+
+# Persistent lookup cache shared by all providers and sessions
+CACHE_ENABLED = os.environ.get("GEOLOOKUP_CACHE", "1") != "0"
+CACHE_PATH = os.environ.get(
+    "GEOLOOKUP_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "lookup_cache.sqlite3")
+)
+
+# Names learned from the WBD server are appended here (next to the lookup
+# cache, outside the source tree's tracked files) and read after HUC_NAMES_PATH
+LEARNED_HUC_NAMES_PATH = os.environ.get(
+    "GEOLOOKUP_HUC_NAMES_PATH", os.path.join(os.path.dirname(os.path.abspath(CACHE_PATH)), "huc_names_learned.csv")
+)
+
+# Checkpoints of GUI imports, one per input file, so an import that was
+# closed midway picks up where it stopped when the same file is imported again
+IMPORT_CHECKPOINT_DIR = os.environ.get(
+    "GEOLOOKUP_CHECKPOINT_DIR", os.path.join(os.path.dirname(os.path.abspath(CACHE_PATH)), "checkpoints")
+)
+
+# Least recently used entries are evicted past this many rows
+CACHE_MAX_ENTRIES = 1_000_000
+
+# Seconds a cached answer stays valid, per provider
+CACHE_TTLS = {
+    "elevation": 365 * 24 * 3600,
+    "state_county": 180 * 24 * 3600,
+    "watershed": 90 * 24 * 3600,
+    "plss": 90 * 24 * 3600,
+}
+
+# How coordinates are normalised into cache keys:
+#   "round"   - round lat/lon to CACHE_KEY_DECIMALS[provider] places
+#   "geohash" - the geohash cell of CACHE_GEOHASH_PRECISION[provider] characters
+CACHE_KEY_MODE = "round"
+CACHE_KEY_DECIMALS = {
+    "elevation": 5,       # ~1 m
+    "state_county": 4,    # ~11 m
+    "watershed": 5,
+    "plss": 5,
+}
+CACHE_GEOHASH_PRECISION = {
+    "elevation": 9,       # ~5 m cells
+    "state_county": 8,    # ~38 m cells
+    "watershed": 9,
+    "plss": 9,
+}
+
+# Polygons kept in memory per provider for reusing answers of points that
+# fall inside an area already looked up
+POLYGON_CACHE_SIZE = 20000
+
+# Batches of ELEVATION_BATCH_SIZE rows a streaming job keeps in flight per
+# worker. Reading pauses when this many are waiting, so memory stays flat.
+PIPELINE_CHUNKS_PER_WORKER = 2
+
+# Requests per second allowed to each provider host, as (start, min, max).
+# Each host's rate rises slowly while responses are quick and is halved on
+# a 429/503, so it settles near the highest rate the service tolerates.
+# The public opentopodata API allows one request per second.
+RATE_LIMITS = {
+    "api.opentopodata.org": (1.0, 0.2, 1.0),
+    "geo.fcc.gov": (5.0, 0.5, 20.0),
+    "hydro.nationalmap.gov": (5.0, 0.5, 20.0),
+    "gis.blm.gov": (4.0, 0.5, 20.0),
+}
+RATE_LIMIT_DEFAULT = (2.0, 0.5, 10.0)
+
+# Requests per second added to a host's rate for each quick response
+RATE_LIMIT_INCREASE = 0.1
+
+# Responses slower than this many seconds lower the host's rate a little
+RATE_LIMIT_TARGET_LATENCY = 3.0
+
+# Times a rate limited (429/503) request is retried before giving up, and
+# the longest Retry-After wait honoured
+RATE_LIMIT_MAX_RETRIES = 5
+RATE_LIMIT_MAX_WAIT = 60
+
+# Shared HTTP connections. Connections to each provider host are kept alive
+# and reused; HTTP_POOL_SIZE is the most kept open per host, for up to
+# HTTP_POOL_HOSTS hosts at once.
+HTTP_POOL_SIZE = 32
+HTTP_POOL_HOSTS = 8
+
+# (connect, read) timeouts in seconds for every provider request. Within a
+# lookup they are cut to what is left of the provider's timeout.
+HTTP_TIMEOUTS = (5, 30)
+
+# Times a request that failed to connect, timed out or got a 500/502/504 is
+# retried, waiting a random time up to HTTP_BACKOFF_BASE * 2**attempt
+# (at most HTTP_BACKOFF_MAX) seconds between tries
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 10
+
+# asyncio engine (async_engine.enrich): lookups running at once per provider,
+# and points in flight in total. Each running lookup holds a thread while it
+# waits for its host.
+#
+# A provider never gets more slots than its host can serve at the starting
+# rate of RATE_LIMITS within ASYNC_TIMEOUT_SHARE of its timeout
+# (Provider.concurrency), so lookups do not time out queueing for the rate
+# limiter while the server is healthy.
+ASYNC_TIMEOUT_SHARE = 0.2
+ASYNC_PROVIDER_LIMITS = {
+    "elevation": 4,
+    "state_county": 64,
+    "watershed": 64,
+    "plss": 64,
+}
+ASYNC_MAX_IN_FLIGHT = 500
+
+# Spatial ordering of batch jobs: "none" keeps file order, "hilbert" or
+# "zorder" follow a space-filling curve, "grid" groups points by
+# SPATIAL_ORDER_CELL degree squares. Points are reordered within windows of
+# SPATIAL_ORDER_WINDOW rows and written back in file order.
+SPATIAL_ORDER = os.environ.get("GEOLOOKUP_SPATIAL_ORDER", "none")
+SPATIAL_ORDER_WINDOW = 5000
+SPATIAL_ORDER_BITS = 16
+SPATIAL_ORDER_CELL = 0.1
+
+# GeoParquet exports: rows per row group (also how often the streaming
+# writer of a batch job flushes) and the compression codec
+PARQUET_ROW_GROUP_SIZE = 50_000
+PARQUET_COMPRESSION = "zstd"
+
+# Rows parsed at a time when reading point files (ingest_points)
+INGEST_CHUNK_SIZE = 100_000
+
+# GUI: milliseconds between frames, when updates posted by worker threads
+# are applied and the results table and status log are redrawn, and log
+# lines kept for the status log
+GUI_FRAME_MS = 50
+LOG_BUFFER_SIZE = 1000
@@ -14,42 +14,45 @@ from get_state_county import get_state_county
 from clear_results import clear_results
 from get_watershed_info import get_watershed_info
 from generate_google_maps_link import generate_google_maps_link
-from get_data_and_display import get_data_and_display
+from get_data_and_display import get_data_and_display, add_result
 from export_to_csv import export_to_csv
-from import_from_csv import import_from_csv
+from export_to_parquet import export_to_parquet
+from import_from_csv import import_from_csv, close_import_checkpoints
 from update_status import update_status
-from display_results import display_results
 from convert_latlon_utm import convert_latlon_utm
-
-class StatusWindowHandler(logging.Handler):
-    def __init__(self, text_widget):
-        super().__init__()
-        self.text_widget = text_widget
-
-    def emit(self, record):
-        log_entry = self.format(record)
-        # Remove the log level prefix (e.g., "DEBUG - ")
-        log_entry = log_entry.split(" - ", 1)[-1]
-        self.text_widget.config(state='normal')
-        self.text_widget.insert(tk.END, log_entry + '\n')
-        self.text_widget.config(state='disabled')
-        self.text_widget.yview(tk.END)
+from utm_batch import parse_utm_zone
+from lookup_cache import get_lookup_cache
+from rate_limiter import rate_limiter_stats
+from http_session import close_session
+from lookup_scheduler import get_lookup_scheduler
+from result_store import ResultStore
+from providers import PROVIDERS, BASE_FIELDS, LINK_FIELD, result_fields
+from result_view import ResultView
+from log_buffer import RingBufferHandler
+from gui_bridge import start_gui_bridge
+from lookup_settings import PLSS_PROVIDER, WATERSHED_PROVIDER, STATE_COUNTY_PROVIDER
 
 # Global variables
-cumulative_results = []
+cumulative_results = ResultStore()
 headings_printed = False
 auto_increment_label = 1
 gdf_cache = {}
 query_cache = {}
 
 def close_application():
+    lookup_cache = get_lookup_cache()
+    if lookup_cache is not None:
+        logging.info(f"Lookup cache hits/misses: {lookup_cache.stats()}")
+        lookup_cache.close()
+    logging.info(f"Provider request rates: {rate_limiter_stats()}")
+    close_import_checkpoints()
+    close_session()
     root.quit()
     root.destroy()
 
-def clear_history(tree, label_counter, processed_counter, total_records, progress_var):
+def clear_history(results_view, label_counter, processed_counter, total_records, progress_var):
     """Clears the Treeview and resets counters."""
-    for row in tree.get_children():
-        tree.delete(row)
+    results_view.clear()
     label_counter.set(1)
     processed_counter.set(0)
     total_records.set(0)
@@ -64,22 +67,37 @@ def show_loading_popup():
     loading_popup.update_idletasks()
     return loading_popup
 
+def load_databases(gdf_cache):
+    # Local spatial indexes are built once here instead of on the first lookup
+    if PLSS_PROVIDER == "local":
+        from plss_index import load_plss_index
+        try:
+            gdf_cache["plss"] = load_plss_index()
+        except Exception as e:
+            logging.error(f"Error loading local PLSS data, falling back to BLM server: {e}")
+    if WATERSHED_PROVIDER == "local":
+        from wbd_index import load_wbd_index
+        try:
+            gdf_cache["wbd"] = load_wbd_index()
+        except Exception as e:
+            logging.error(f"Error loading local WBD data: {e}")
+    if STATE_COUNTY_PROVIDER == "local":
+        from county_index import load_county_index
+        try:
+            gdf_cache["counties"] = load_county_index()
+        except Exception as e:
+            logging.error(f"Error loading local county boundaries: {e}")
+
 def close_loading_popup(popup):
     popup.destroy()
 
 def on_submit(
     entry_lat, entry_lon, entry_utm_zone, entry_utm_easting, entry_utm_northing,
-    entry_label, root, update_status, get_data_and_display, status_var, label_var,
-    lat_var, lon_var, utm_zone_var, utm_easting_var, utm_northing_var,
-    state_var, county_var, elevation_var, region_var, subregion_var, subbasin_var,
-    watershed_var, subwatershed_var, catchment_var, huc12_var, principle_meridian_var,
-    township_var, range_var, qqsec_var, google_maps_var,
-    gdf_cache, tree, query_cache, huc12_enabled,
-    status_display_var,
-    section_var, qsec_var,           # NEW fields
-    label_counter, processed_counter, total_records, progress_var
+    entry_label, root, update_status, get_data_and_display, status_var, result_vars,
+    gdf_cache, results_view, query_cache,
+    processed_counter, total_records, progress_var
 ):
-    global auto_increment_label, cumulative_results
+    global auto_increment_label
 
     lat = entry_lat.get().strip()
     lon = entry_lon.get().strip()
@@ -101,19 +119,20 @@ def on_submit(
     # Convert UTM -> lat/lon if needed
     if utm_zone and utm_easting and utm_northing:
         try:
-            utm_zone = int(utm_zone)
+            # The zone may carry a latitude band letter, e.g. 56H south of the equator
+            utm_zone, northern = parse_utm_zone(utm_zone)
             utm_easting = float(utm_easting)
             utm_northing = float(utm_northing)
-            lat, lon = utm.to_latlon(utm_easting, utm_northing, utm_zone, northern=True)
+            lat, lon = utm.to_latlon(utm_easting, utm_northing, utm_zone, northern=northern)
         except ValueError as e:
             messagebox.showerror("Input Error", f"Invalid UTM coordinates: {e}")
             return
 
-    lat_var.set(str(lat))
-    lon_var.set(str(lon))
-    utm_zone_var.set(str(utm_zone))
-    utm_easting_var.set(str(utm_easting))
-    utm_northing_var.set(str(utm_northing))
+    result_vars["latitude"].set(str(lat))
+    result_vars["longitude"].set(str(lon))
+    result_vars["utm_zone"].set(str(utm_zone))
+    result_vars["utm_easting"].set(str(utm_easting))
+    result_vars["utm_northing"].set(str(utm_northing))
 
     # Auto-increment label if none given
     if not label:
@@ -121,16 +140,8 @@ def on_submit(
         auto_increment_label += 1
 
     get_data_and_display(
-        lat, lon, label,
-        label_counter, update_status, display_results,
-        root, cumulative_results, status_var, label_var, lat_var, lon_var,
-        utm_zone_var, utm_easting_var, utm_northing_var,
-        state_var, county_var, elevation_var,
-        region_var, subregion_var, subbasin_var, watershed_var, subwatershed_var, catchment_var,
-        huc12_var, principle_meridian_var, township_var, range_var, qqsec_var, google_maps_var,
-        gdf_cache, tree, query_cache, huc12_enabled,
-        status_display_var,
-        section_var, qsec_var,             # pass new vars
+        lat, lon, label, update_status, root, status_var, result_vars,
+        gdf_cache, results_view, query_cache,
         progress_var, processed_counter, total_records
     )
 
@@ -139,9 +150,12 @@ def on_submit(
 # -----------------------
 root = tk.Tk()
 root.withdraw()
+# Worker threads update the GUI only through the bridge
+gui_bridge = start_gui_bridge(root)
 root.geometry("1625x400")
 
 loading_popup = show_loading_popup()
+load_databases(gdf_cache)
 close_loading_popup(loading_popup)
 root.deiconify()
 root.title("Geospatial Lookup")
@@ -162,48 +176,23 @@ bottom_frame.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
 spacer_frame = tk.Frame(bottom_frame, height=20)
 spacer_frame.pack(side=tk.TOP, fill=tk.X)
 
-# Define all StringVars in the same style
-label_var = tk.StringVar()
-lat_var = tk.StringVar()
-lon_var = tk.StringVar()
-utm_zone_var = tk.StringVar()
-utm_easting_var = tk.StringVar()
-utm_northing_var = tk.StringVar()
-state_var = tk.StringVar()
-county_var = tk.StringVar()
-elevation_var = tk.StringVar()
-region_var = tk.StringVar()
-subregion_var = tk.StringVar()
-subbasin_var = tk.StringVar()
-watershed_var = tk.StringVar()
-subwatershed_var = tk.StringVar()
-catchment_var = tk.StringVar()
-huc12_var = tk.StringVar()
-principle_meridian_var = tk.StringVar()
-township_var = tk.StringVar()
-range_var = tk.StringVar()
-qqsec_var = tk.StringVar()
-google_maps_var = tk.StringVar()
 status_var = tk.StringVar()          # define status_var
 status_display_var = tk.StringVar()
 progress_var = tk.StringVar()
 
-# NEW: Section & Quarter Section
-section_var = tk.StringVar()
-qsec_var = tk.StringVar()
+# Every column of a result row, from the registered providers
+fields = result_fields()
+
+# One read-only StringVar per result field for the fields panel
+result_vars = {field.key: tk.StringVar() for field in fields}
 
-# Treeview columns (add "section" & "qsec" before "qqs")
-columns = [
-    "label", "latitude", "longitude", "utm_zone", "utm_easting", "utm_northing",
-    "state", "county", "elevation", "region", "subregion", "subbasin",
-    "watershed", "sub-watershed", "catchment", "huc12_code", "principle_meridian",
-    "township", "range", "section", "qsec", "qqs", "google_maps"
-]
-tree = ttk.Treeview(bottom_frame, columns=columns, show='headings')
+tree = ttk.Treeview(bottom_frame, columns=[field.key for field in fields], show='headings')
 
-vsb = ttk.Scrollbar(bottom_frame, orient="vertical", command=tree.yview)
+# The view fills the Treeview with just the rows on screen and drives the
+# vertical scrollbar itself
+vsb = ttk.Scrollbar(bottom_frame, orient="vertical")
 vsb.pack(side='right', fill='y')
-tree.configure(yscrollcommand=vsb.set)
+results_view = ResultView(gui_bridge, tree, vsb, cumulative_results)
 
 hsb = ttk.Scrollbar(bottom_frame, orient="horizontal", command=tree.xview)
 hsb.pack(side='bottom', fill='x')
@@ -211,29 +200,16 @@ tree.configure(xscrollcommand=hsb.set)
 
 tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-headers = [
-    "Label", "Latitude", "Longitude", "UTM Zone", "UTM Easting", "UTM Northing",
-    "State", "County", "Elevation", "Region", "Subregion", "Sub-Basin",
-    "Watershed", "Sub-Watershed", "Catchment", "HUC12 Code", "Principle Meridian",
-    "Township", "Range", "Section", "1/4 Sec", "1/4 1/4 Sec", "Google Maps"
-]
-
-width_factors = {
-    "latitude": 0.6, "longitude": 0.6, "utm_zone": 0.6,
-    "utm_easting": 0.6, "utm_northing": 0.6,
-    "state": 0.6, "elevation": 0.6, "township": 0.6,
-    "range": 0.6, "section": 0.6, "qsec": 0.6,
-    "qqs": 0.6, "google_maps": 1.5
-}
-
-for col, header in zip(columns, headers):
-    if col in width_factors:
-        width = int(font.Font().measure(header) + 100)
-        adjusted_width = int(width * width_factors[col])
-        tree.column(col, width=adjusted_width, anchor=tk.CENTER)
-    else:
-        tree.column(col, width=font.Font().measure(header) + 100, anchor=tk.CENTER)
-    tree.heading(col, text=header, anchor=tk.CENTER)
+# Numbers and short codes get narrow columns, the link a wide one
+width_factors = {"float": 0.6, "int": 0.6, "link": 1.5}
+narrow_columns = ("state", "township", "range", "section", "qsec", "qqs")
+
+for field in fields:
+    header = field.short or field.header
+    width = font.Font().measure(header) + 100
+    factor = 0.6 if field.key in narrow_columns else width_factors.get(field.kind, 1)
+    tree.column(field.key, width=int(width * factor), anchor=tk.CENTER)
+    tree.heading(field.key, text=header, anchor=tk.CENTER)
 
 style = ttk.Style()
 style.configure("Treeview.Heading", font=bold_font)
@@ -267,126 +243,82 @@ submit_button = tk.Button(
     top_frame, text="Submit",
     command=lambda: on_submit(
         entry_lat, entry_lon, entry_utm_zone, entry_utm_easting, entry_utm_northing,
-        entry_label, root, update_status, get_data_and_display, status_var, label_var,
-        lat_var, lon_var, utm_zone_var, utm_easting_var, utm_northing_var,
-        state_var, county_var, elevation_var, region_var, subregion_var, subbasin_var,
-        watershed_var, subwatershed_var, catchment_var, huc12_var, principle_meridian_var,
-        township_var, range_var, qqsec_var, google_maps_var,
-        gdf_cache, tree, query_cache, huc12_enabled,
-        status_display_var,
-        section_var, qsec_var,               # NEW
-        label_counter, processed_counter, total_records, progress_var
+        entry_label, root, update_status, get_data_and_display, status_var, result_vars,
+        gdf_cache, results_view, query_cache,
+        processed_counter, total_records, progress_var
     )
 )
 submit_button.grid(row=6, column=0, columnspan=2, padx=10, pady=1, sticky="nw")
 
-# Output fields (second column)
-tk.Label(top_frame, text="Label:").grid(row=0, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=label_var, state='readonly', width=40).grid(row=0, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Latitude:").grid(row=1, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=lat_var, state='readonly', width=40).grid(row=1, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Longitude:").grid(row=2, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=lon_var, state='readonly', width=40).grid(row=2, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="UTM Zone:").grid(row=3, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=utm_zone_var, state='readonly', width=40).grid(row=3, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="UTM Easting:").grid(row=4, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=utm_easting_var, state='readonly', width=40).grid(row=4, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="UTM Northing:").grid(row=5, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=utm_northing_var, state='readonly', width=40).grid(row=5, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="State:").grid(row=6, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=state_var, state='readonly', width=40).grid(row=6, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="County:").grid(row=7, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=county_var, state='readonly', width=40).grid(row=7, column=3, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Elevation:").grid(row=8, column=2, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=elevation_var, state='readonly', width=40).grid(row=8, column=3, padx=10, pady=2, sticky="w")
-
-# Third column (watershed, etc.) ...
-tk.Label(top_frame, text="Region:").grid(row=0, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=region_var, state='readonly', width=40).grid(row=0, column=5, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Subregion:").grid(row=1, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=subregion_var, state='readonly', width=40).grid(row=1, column=5, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Sub-Basin:").grid(row=2, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=subbasin_var, state='readonly', width=40).grid(row=2, column=5, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Watershed:").grid(row=3, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=watershed_var, state='readonly', width=40).grid(row=3, column=5, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Sub-Watershed:").grid(row=4, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=subwatershed_var, state='readonly', width=40).grid(row=4, column=5, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Catchment:").grid(row=5, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=catchment_var, state='readonly', width=40).grid(row=5, column=5, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="HUC12 Code:").grid(row=6, column=4, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=huc12_var, state='readonly', width=40).grid(row=6, column=5, padx=10, pady=2, sticky="w")
-
-# Fourth column (PLSS, Google Maps, etc.)
-tk.Label(top_frame, text="Principle Meridian:").grid(row=0, column=6, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=principle_meridian_var, state='readonly', width=40).grid(row=0, column=7, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Township:").grid(row=1, column=6, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=township_var, state='readonly', width=40).grid(row=1, column=7, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Range:").grid(row=2, column=6, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=range_var, state='readonly', width=40).grid(row=2, column=7, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Quarter Quarter Section:").grid(row=3, column=6, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=qqsec_var, state='readonly', width=40).grid(row=3, column=7, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Section:").grid(row=4, column=6, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=section_var, state='readonly', width=40).grid(row=4, column=7, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Quarter Section:").grid(row=5, column=6, padx=10, pady=2, sticky="w")
-tk.Entry(top_frame, textvariable=qsec_var, state='readonly', width=40).grid(row=5, column=7, padx=10, pady=2, sticky="w")
-
-tk.Label(top_frame, text="Google Maps:").grid(row=6, column=6, padx=10, pady=2, sticky="w")
-google_maps_label = tk.Label(top_frame, textvariable=google_maps_var, fg="blue", cursor="hand2")
-google_maps_label.grid(row=6, column=7, padx=10, pady=2, sticky="w")
-google_maps_label.bind("<Button-1>", lambda event: webbrowser.open_new(google_maps_var.get()))
+# Output fields, in label/value column pairs from grid column 2. The first
+# pair holds 9 rows and the later ones 7, leaving room for the status log
+# under them. A provider's fields start a new pair when they do not fit in
+# the current one, and the Google Maps link goes last.
+field_groups = [list(BASE_FIELDS)]
+for group_fields in [provider.fields for provider in PROVIDERS.values()] + [(LINK_FIELD,)]:
+    if len(field_groups[-1]) + len(group_fields) > (9 if len(field_groups) == 1 else 7):
+        field_groups.append([])
+    field_groups[-1].extend(group_fields)
+
+for group, group_fields in enumerate(field_groups):
+    column = 2 + 2 * group
+    for row, field in enumerate(group_fields):
+        tk.Label(top_frame, text=f"{field.header}:").grid(row=row, column=column, padx=10, pady=2, sticky="w")
+        if field.kind == "link":
+            google_maps_label = tk.Label(top_frame, textvariable=result_vars[field.key], fg="blue", cursor="hand2")
+            google_maps_label.grid(row=row, column=column + 1, padx=10, pady=2, sticky="w")
+            google_maps_label.bind("<Button-1>", lambda event: webbrowser.open_new(result_vars["google_maps"].get()))
+        else:
+            tk.Entry(top_frame, textvariable=result_vars[field.key], state='readonly', width=40).grid(
+                row=row, column=column + 1, padx=10, pady=2, sticky="w"
+            )
 
 status_text = tk.Text(top_frame, height=4, width=83, state='disabled', wrap='word')
 status_text.grid(row=7, column=5, columnspan=3, rowspan=2, padx=10, pady=2, sticky="w")
-status_handler = StatusWindowHandler(status_text)
-formatter = logging.Formatter('%(levelname)s - %(message)s')
-status_handler.setFormatter(formatter)
+# Log records go to a bounded buffer; the status box shows its tail once per
+# GUI frame instead of being redrawn for every record
+status_handler = RingBufferHandler()
+status_handler.setFormatter(logging.Formatter('%(message)s'))
 logger = logging.getLogger()
 logger.addHandler(status_handler)
 logger.setLevel(logging.DEBUG)
+status_log_shown = 0
+
+def refresh_status_text():
+    global status_log_shown
+    if status_handler.count != status_log_shown:
+        status_log_shown = status_handler.count
+        status_text.config(state='normal')
+        status_text.delete('1.0', tk.END)
+        status_text.insert(tk.END, '\n'.join(status_handler.tail(int(status_text.cget('height')))))
+        status_text.config(state='disabled')
+        status_text.yview(tk.END)
+
+gui_bridge.on_frame(refresh_status_text)
 
 export_button = tk.Button(top_frame, text="Export to CSV", command=lambda: export_to_csv(cumulative_results))
 export_button.grid(row=7, column=0, padx=10, pady=1, sticky="w")
 
+export_parquet_button = tk.Button(
+    top_frame, text="Export to GeoParquet", command=lambda: export_to_parquet(cumulative_results)
+)
+export_parquet_button.grid(row=9, column=0, padx=10, pady=1, sticky="w")
+
 import_button = tk.Button(
     top_frame,
-    text="Import coordinates from CSV (expects label,lat,long)",
+    text="Import coordinates (CSV, Parquet, GeoPackage, Shapefile)",
     command=lambda: import_from_csv(
-        lambda lat, lon, label, progress_var, processed_counter, total_records, update_status, status_var, root: get_data_and_display(
-            lat, lon, label, 
-            label_counter, update_status, display_results, root, cumulative_results,
-            status_var, label_var, lat_var, lon_var, utm_zone_var, utm_easting_var, utm_northing_var,
-            state_var, county_var, elevation_var, region_var, subregion_var, subbasin_var, watershed_var,
-            subwatershed_var, catchment_var, huc12_var, principle_meridian_var, township_var, range_var,
-            qqsec_var, google_maps_var,
-            gdf_cache, tree, query_cache, huc12_enabled,
-            status_display_var,
-            section_var, qsec_var,  # NEW
+        lambda result, progress_var, processed_counter, total_records, update_status, status_var, root: add_result(
+            result, update_status, root, status_var, result_vars, results_view,
             progress_var, processed_counter, total_records
         ),
         update_status,
         status_var,
         root,
         progress_var,
-        processed_counter  # <-- ADDED here
+        processed_counter,  # <-- ADDED here
+        gdf=gdf_cache.get("plss"),
+        query_cache=query_cache
     )
 )
 
@@ -396,11 +328,7 @@ clear_button = tk.Button(
     top_frame, text="Clear Results",
     command=lambda: clear_results(
         entry_label, entry_lon, entry_lat, entry_utm_zone, entry_utm_easting, entry_utm_northing,
-        label_var, lat_var, lon_var, utm_zone_var, utm_easting_var, utm_northing_var,
-        state_var, county_var, elevation_var, region_var, subregion_var, subbasin_var,
-        watershed_var, subwatershed_var, catchment_var, huc12_var, principle_meridian_var,
-        township_var, range_var, qqsec_var, google_maps_var,
-        section_var, qsec_var
+        result_vars
     )
 )
 clear_button.grid(row=8, column=0, padx=10, pady=1, sticky="w")
@@ -408,12 +336,25 @@ clear_button.grid(row=8, column=0, padx=10, pady=1, sticky="w")
 clear_history_button = tk.Button(
     top_frame,
     text="Clear History",
-    command=lambda: clear_history(tree, label_counter, processed_counter, total_records, progress_var)
+    command=lambda: clear_history(results_view, label_counter, processed_counter, total_records, progress_var)
 )
 clear_history_button.grid(row=8, column=1, padx=10, pady=1, sticky="w")
 
 status_bar = tk.Label(root, bd=1, relief=tk.SUNKEN, anchor=tk.W, textvariable=status_var)
 status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
+# Queued/running/done counts of the lookup scheduler
+def show_scheduler_counts(counts):
+    if counts["queued"] or counts["running"]:
+        text = f"Lookups: {counts['queued']} queued, {counts['running']} running, {counts['done']} done"
+    else:
+        text = f"Waiting for Input ({counts['done']} lookups done)"
+    gui_bridge.set_var(status_display_var, text)
+
+status_display_var.set("Waiting for Input")
+scheduler_bar = tk.Label(root, bd=1, relief=tk.SUNKEN, anchor=tk.W, textvariable=status_display_var)
+scheduler_bar.pack(side=tk.BOTTOM, fill=tk.X)
+get_lookup_scheduler().add_listener(show_scheduler_counts)
+
 root.protocol("WM_DELETE_WINDOW", close_application)
 root.mainloop()
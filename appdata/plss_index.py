@@ -0,0 +1,75 @@
+import threading
+import logging
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely import STRtree
+
+from get_plss_data import parse_plss_attributes
+from lookup_settings import PLSS_SECTIONS_PATH, PLSS_QQ_PATH
+
+SECTION_FIELDS = ['PRINMER', 'TWNSHPLAB', 'FRSTDIVNO']
+QQ_FIELDS = ['QSEC', 'QQSEC']
+
+def load_layer(path, fields):
+    gdf = gpd.read_parquet(path)
+    if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(4326)
+    # Keep only the attributes the lookup returns, missing ones become None
+    columns = {}
+    for field in fields:
+        if field in gdf.columns:
+            columns[field] = gdf[field].astype(object).where(gdf[field].notna(), None).to_numpy()
+        else:
+            columns[field] = np.full(len(gdf), None, dtype=object)
+    return gdf.geometry.values, columns
+
+# In-process PLSS lookups against CadNSDI layers exported to GeoParquet
+class PlssIndex:
+    def __init__(self, sections_path=PLSS_SECTIONS_PATH, qq_path=PLSS_QQ_PATH):
+        logging.debug(f"Loading PLSS sections from {sections_path}...")
+        section_geoms, self.section_attrs = load_layer(sections_path, SECTION_FIELDS)
+        self.section_tree = STRtree(section_geoms)
+
+        logging.debug(f"Loading PLSS quarter-quarter sections from {qq_path}...")
+        qq_geoms, self.qq_attrs = load_layer(qq_path, QQ_FIELDS)
+        self.qq_tree = STRtree(qq_geoms)
+        logging.debug(f"PLSS index ready: {len(section_geoms)} sections, {len(qq_geoms)} QQ sections")
+
+    def _first_hits(self, tree, points):
+        # Index of the first polygon containing each point, -1 for none
+        hits = np.full(len(points), -1, dtype=np.int64)
+        point_idx, poly_idx = tree.query(points, predicate='intersects')
+        # Keep the first polygon found for each point
+        first = np.unique(point_idx, return_index=True)[1]
+        hits[point_idx[first]] = poly_idx[first]
+        return hits
+
+    def lookup_many(self, lats, lons):
+        points = shapely.points(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        section_hits = self._first_hits(self.section_tree, points)
+        qq_hits = self._first_hits(self.qq_tree, points)
+
+        results = []
+        for section, qq in zip(section_hits, qq_hits):
+            if section < 0:
+                results.append(parse_plss_attributes(None))
+                continue
+            attributes = {field: values[section] for field, values in self.section_attrs.items()}
+            if qq >= 0:
+                attributes.update({field: values[qq] for field, values in self.qq_attrs.items()})
+            results.append(parse_plss_attributes(attributes))
+        return results
+
+    def lookup_point(self, point):
+        return self.lookup_many([point.y], [point.x])[0]
+
+_plss_index = None
+_plss_index_lock = threading.Lock()
+
+def load_plss_index():
+    global _plss_index
+    with _plss_index_lock:
+        if _plss_index is None:
+            _plss_index = PlssIndex()
+        return _plss_index
@@ -0,0 +1,85 @@
+import math
+import threading
+import logging
+from collections import OrderedDict
+from shapely.geometry import Point, Polygon, MultiPolygon, LinearRing
+from shapely.prepared import prep
+
+from lookup_settings import POLYGON_CACHE_SIZE
+
+# Grid cell size in degrees used to find candidate polygons for a point
+CELL_SIZE = 0.1
+
+def esri_rings_to_shape(geometry):
+    # Esri JSON polygons list outer rings clockwise and holes counter-clockwise
+    outers, holes = [], []
+    for ring in (geometry or {}).get('rings', []):
+        if len(ring) < 4:
+            continue
+        if LinearRing(ring).is_ccw:
+            holes.append(ring)
+        else:
+            outers.append([ring, []])
+    if not outers:
+        return None
+    for hole in holes:
+        for outer in outers:
+            if Polygon(outer[0]).contains(Point(hole[0])):
+                outer[1].append(hole)
+                break
+    polygons = [Polygon(shell, interiors) for shell, interiors in outers]
+    return polygons[0] if len(polygons) == 1 else MultiPolygon(polygons)
+
+# Answers of polygon-valued lookups (HUC12, PLSS quarter-quarter section)
+# together with the polygon they hold for. Any later point inside one of those
+# polygons gets the same answer without a request.
+class PolygonAnswerCache:
+    def __init__(self, max_polygons=POLYGON_CACHE_SIZE):
+        self.max_polygons = max_polygons
+        self._entries = {}  # provider -> OrderedDict(id -> (prepared shape, bounds, answer))
+        self._cells = {}    # (provider, cell_x, cell_y) -> set of ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _cells_for(self, bounds):
+        min_x, min_y, max_x, max_y = bounds
+        for cell_x in range(math.floor(min_x / CELL_SIZE), math.floor(max_x / CELL_SIZE) + 1):
+            for cell_y in range(math.floor(min_y / CELL_SIZE), math.floor(max_y / CELL_SIZE) + 1):
+                yield cell_x, cell_y
+
+    def remember(self, provider, shape, answer):
+        if shape is None or shape.is_empty or answer is None:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(provider, OrderedDict())
+            entry_id = self._next_id
+            self._next_id += 1
+            entries[entry_id] = (prep(shape), shape.bounds, answer)
+            for cell in self._cells_for(shape.bounds):
+                self._cells.setdefault((provider, *cell), set()).add(entry_id)
+            while len(entries) > self.max_polygons:
+                self._forget(provider, *entries.popitem(last=False))
+
+    def _forget(self, provider, entry_id, entry):
+        for cell in self._cells_for(entry[1]):
+            ids = self._cells.get((provider, *cell))
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._cells[(provider, *cell)]
+
+    def lookup(self, provider, lat, lon):
+        lat, lon = float(lat), float(lon)
+        point = Point(lon, lat)
+        cell = (math.floor(lon / CELL_SIZE), math.floor(lat / CELL_SIZE))
+        with self._lock:
+            entries = self._entries.get(provider)
+            for entry_id in self._cells.get((provider, *cell), ()):
+                prepared, bounds, answer = entries[entry_id]
+                if bounds[0] <= lon <= bounds[2] and bounds[1] <= lat <= bounds[3] and prepared.contains(point):
+                    entries.move_to_end(entry_id)
+                    logging.debug(f"Reusing {provider} answer from a cached polygon for lat: {lat}, lon: {lon}")
+                    return answer
+        return None
+
+polygon_cache = PolygonAnswerCache()
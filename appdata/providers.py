@@ -0,0 +1,256 @@
+import importlib
+import logging
+from collections import namedtuple
+
+from get_elevation import get_elevation, get_elevations
+from get_state_county import get_state_county, get_states_counties
+from get_watershed_info import get_watershed_info
+from get_plss_data import get_plss_data
+from rate_limiter import set_rate_limit
+from update_status import log_status
+from lookup_settings import (
+    PROVIDER_TIMEOUTS, CACHE_TTLS, ASYNC_PROVIDER_LIMITS, ASYNC_TIMEOUT_SHARE, RATE_LIMITS, STATE_COUNTY_PROVIDER,
+    PROVIDER_MODULES
+)
+
+# Provider registry. Each provider declares the result fields it fills in,
+# how to look up one point and (optionally) many at once, and its timeout,
+# cache lifetime, asyncio concurrency and per-host request rates. The lookup
+# engines, the result store, the exporters and the GUI columns are all built
+# from the registered providers, so adding one is a matter of registering it:
+#
+#   class SoilProvider(Provider):
+#       name = "soil"
+#       fields = (Field("soil_unit", "Soil Unit"),)
+#       def lookup(self, lat, lon, context):
+#           return fetch_soil_unit(lat, lon)
+#
+#   register_provider(SoilProvider())
+#
+# Modules listed in GEOLOOKUP_PROVIDER_MODULES are imported at start-up so
+# they can register providers (or replace a built-in one of the same name)
+# without editing this file.
+
+# One column of a result row. kind is "text", "float", "int", "category"
+# (few distinct values, dictionary encoded in the ResultStore) or "link"
+# (rebuilt from the coordinates, never stored); missing is what a row holds
+# without a value; short is a narrower heading for the Treeview.
+Field = namedtuple("Field", ("key", "header", "kind", "missing", "short"), defaults=("category", 'N/A', None))
+FIELD_KINDS = ("text", "float", "int", "category", "link")
+
+# Columns every row has before the provider fields, and the link after them
+BASE_FIELDS = (
+    Field("label", "Label", "text", ""),
+    Field("latitude", "Latitude", "float", None),
+    Field("longitude", "Longitude", "float", None),
+    Field("utm_zone", "UTM Zone", "int", None),
+    Field("utm_easting", "UTM Easting", "int", None),
+    Field("utm_northing", "UTM Northing", "int", None),
+)
+LINK_FIELD = Field("google_maps", "Google Maps", "link", None)
+
+class LookupContext:
+    # What a lookup may need besides the point: where to report progress
+    # (the GUI status bar, or the log when headless) and the GUI's
+    # in-memory query cache and local PLSS index
+    def __init__(self, update_status=log_status, status_var=None, root=None, query_cache=None, gdf=None):
+        self.update_status = update_status
+        self.status_var = status_var
+        self.root = root
+        self.query_cache = {} if query_cache is None else query_cache
+        self.gdf = gdf
+
+    def status(self, message):
+        self.update_status(message, self.status_var, self.root)
+
+class Provider:
+    name = None
+    fields = ()
+    # Keys of the provider's own result dict for each field key, when they differ
+    value_keys = {}
+    timeout = 30       # seconds per point before the provider is given up on
+    cache_ttl = None   # seconds answers stay in the lookup cache, None to not cache them
+    async_limit = 16   # lookups at once in the asyncio engine
+    rate_limits = {}   # host -> (rate, min_rate, max_rate) in requests per second
+    requests_per_lookup = 1  # most requests one lookup makes to its host
+
+    def lookup(self, lat, lon, context):
+        # The provider's answer for one point, None if it failed
+        raise NotImplementedError
+
+    def concurrency(self):
+        # Lookups the asyncio engine runs at once: async_limit, but no more
+        # than the slowest host's starting rate serves in ASYNC_TIMEOUT_SHARE
+        # of the timeout, so a lookup never spends its timeout queueing for
+        # rate limiter tokens
+        rates = [rate for rate, _, _ in self.rate_limits.values()]
+        if not rates:
+            return self.async_limit
+        served = min(rates) * self.timeout * ASYNC_TIMEOUT_SHARE / self.requests_per_lookup
+        return max(1, min(self.async_limit, int(served)))
+
+    def can_batch(self):
+        # True when lookup_many is cheaper than one lookup per point, so
+        # batch jobs prefetch this provider for a whole chunk at once
+        return False
+
+    def lookup_many(self, points, context):
+        # One answer per (lat, lon) point, in input order
+        return [self.lookup(lat, lon, context) for lat, lon in points]
+
+    def is_cacheable(self, value):
+        # False for a failed lookup, which is then not kept in the cache or
+        # a batch checkpoint so it is retried next time
+        return value is not None and value != 'N/A'
+
+    def decode(self, value):
+        # Undo what the JSON round trip through the lookup cache changed
+        return value
+
+    def result_values(self, value):
+        # The provider's answer spread over its result fields. A single
+        # field provider answers with the value itself, others with a dict.
+        if len(self.fields) == 1 and not isinstance(value, dict):
+            field = self.fields[0]
+            return {field.key: field.missing if value is None else value}
+        value = value or {}
+        return {field.key: value.get(self.value_keys.get(field.key, field.key), field.missing) for field in self.fields}
+
+class StateCountyProvider(Provider):
+    name = "state_county"
+    fields = (Field("state", "State"), Field("county", "County"))
+    timeout = PROVIDER_TIMEOUTS["state_county"]
+    cache_ttl = CACHE_TTLS["state_county"]
+    async_limit = ASYNC_PROVIDER_LIMITS["state_county"]
+    rate_limits = {"geo.fcc.gov": RATE_LIMITS["geo.fcc.gov"]}
+
+    def lookup(self, lat, lon, context):
+        return get_state_county(lat, lon)
+
+    def can_batch(self):
+        # Local county boundaries answer a whole batch in one query
+        return STATE_COUNTY_PROVIDER == "local"
+
+    def lookup_many(self, points, context):
+        return get_states_counties(points)
+
+    def is_cacheable(self, value):
+        return value is not None and value[0] is not None
+
+    def decode(self, value):
+        # JSON turns the (state, county) tuple into a list
+        return tuple(value) if value is not None else value
+
+    def result_values(self, value):
+        state, county = value or (None, None)
+        return {"state": state or 'N/A', "county": county or 'N/A'}
+
+class ElevationProvider(Provider):
+    name = "elevation"
+    fields = (Field("elevation", "Elevation", "float", 'N/A'),)
+    timeout = PROVIDER_TIMEOUTS["elevation"]
+    cache_ttl = CACHE_TTLS["elevation"]
+    async_limit = ASYNC_PROVIDER_LIMITS["elevation"]
+    rate_limits = {"api.opentopodata.org": RATE_LIMITS["api.opentopodata.org"]}
+
+    def lookup(self, lat, lon, context):
+        return get_elevation(lat, lon, context.update_status, context.status_var, context.root)
+
+    def can_batch(self):
+        # Up to ELEVATION_BATCH_SIZE points per request, or local DEM tiles
+        return True
+
+    def lookup_many(self, points, context):
+        return get_elevations(points, context.update_status, context.status_var, context.root)
+
+class WatershedProvider(Provider):
+    name = "watershed"
+    fields = (
+        Field("region", "Region"),
+        Field("subregion", "Subregion"),
+        Field("subbasin", "Sub-Basin"),
+        Field("watershed", "Watershed"),
+        Field("subwatershed", "Sub-Watershed"),
+        Field("catchment", "Catchment"),
+        Field("huc12_code", "HUC12 Code"),
+    )
+    value_keys = {
+        "region": "Region", "subregion": "Subregion", "subbasin": "Sub-Basin", "watershed": "Watershed",
+        "subwatershed": "Sub-Watershed", "catchment": "Catchment", "huc12_code": "HUC12 Code",
+    }
+    timeout = PROVIDER_TIMEOUTS["watershed"]
+    cache_ttl = CACHE_TTLS["watershed"]
+    async_limit = ASYNC_PROVIDER_LIMITS["watershed"]
+    rate_limits = {"hydro.nationalmap.gov": RATE_LIMITS["hydro.nationalmap.gov"]}
+    requests_per_lookup = 6  # every WBD layer when the HUC names are not known locally
+
+    def lookup(self, lat, lon, context):
+        return get_watershed_info(lat, lon, context.update_status, context.status_var, context.root)
+
+    def is_cacheable(self, value):
+        # 'Unknown' is either no feature at the point or a layer whose request
+        # failed while the others answered; keep both out of the cache and the
+        # checkpoint so they are asked again next time
+        return isinstance(value, dict) and 'Unknown' not in value.values()
+
+class PlssProvider(Provider):
+    name = "plss"
+    fields = (
+        Field("principle_meridian", "Principle Meridian"),
+        Field("township", "Township"),
+        Field("range", "Range"),
+        Field("section", "Section"),
+        Field("qsec", "Quarter Section", short="1/4 Sec"),
+        Field("qqs", "Quarter Quarter Section", short="1/4 1/4 Sec"),
+    )
+    value_keys = {
+        "principle_meridian": "Principle Meridian", "township": "Township", "range": "Range",
+        "section": "Section", "qsec": "Quarter Section", "qqs": "Quarter Quarter Section",
+    }
+    timeout = PROVIDER_TIMEOUTS["plss"]
+    cache_ttl = CACHE_TTLS["plss"]
+    async_limit = ASYNC_PROVIDER_LIMITS["plss"]
+    rate_limits = {"gis.blm.gov": RATE_LIMITS["gis.blm.gov"]}
+
+    def lookup(self, lat, lon, context):
+        return get_plss_data(
+            lat, lon, context.gdf, context.update_status, context.status_var, context.root, context.query_cache
+        )
+
+# name -> Provider, in result column order
+PROVIDERS = {}
+
+def register_provider(provider):
+    # A provider with the name of one already registered replaces it in place
+    for field in provider.fields:
+        if field.kind not in FIELD_KINDS:
+            raise ValueError(f"Field {field.key} of the {provider.name} provider has unknown kind {field.kind!r}")
+    if provider.name in PROVIDERS:
+        logging.debug(f"Replacing the {provider.name} provider with {type(provider).__name__}")
+    PROVIDERS[provider.name] = provider
+    if provider.cache_ttl is not None:
+        CACHE_TTLS[provider.name] = provider.cache_ttl
+    for host, (rate, min_rate, max_rate) in provider.rate_limits.items():
+        set_rate_limit(host, rate, min_rate, max_rate)
+    return provider
+
+def get_provider(name):
+    return PROVIDERS[name]
+
+def provider_names():
+    return tuple(PROVIDERS)
+
+def result_fields():
+    return BASE_FIELDS + tuple(field for provider in PROVIDERS.values() for field in provider.fields) + (LINK_FIELD,)
+
+def result_keys():
+    return tuple(field.key for field in result_fields())
+
+for _provider in (StateCountyProvider(), ElevationProvider(), WatershedProvider(), PlssProvider()):
+    register_provider(_provider)
+
+for _module in PROVIDER_MODULES:
+    try:
+        importlib.import_module(_module)
+    except Exception as e:
+        logging.error(f"Error loading provider module {_module}: {e}")
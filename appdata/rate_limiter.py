@@ -0,0 +1,173 @@
+import time
+import threading
+import logging
+from urllib.parse import urlparse
+
+import requests
+
+from lookup_settings import (
+    RATE_LIMITS, RATE_LIMIT_DEFAULT, RATE_LIMIT_INCREASE, RATE_LIMIT_TARGET_LATENCY,
+    RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_MAX_WAIT, HTTP_TIMEOUTS, HTTP_MAX_RETRIES
+)
+from http_session import get_session, backoff_delay, current_deadline, time_left
+
+# Status codes that mean "slow down"
+THROTTLE_STATUS = (429, 503)
+
+# Status codes worth another try after a short backoff
+SERVER_ERROR_STATUS = (500, 502, 504)
+
+# Token bucket for one provider host. Every request takes a token; tokens
+# refill at self.rate per second. The rate adapts AIMD-style: it grows by
+# RATE_LIMIT_INCREASE after each quick response, shrinks a little after a
+# slow one and is halved when the server throttles us. A Retry-After pauses
+# every request to the host, not just the one that was throttled. Tokens are
+# handed out in arrival order: each caller reserves the next one (the bucket
+# may go negative) and sleeps until it is due, so no caller starves.
+class HostRateLimiter:
+    def __init__(self, host, rate, min_rate, max_rate):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+    def acquire(self, deadline=None):
+        # Takes a token; False, without one, if the wait would pass deadline
+        with self._lock:
+            now = time.monotonic()
+            # Allow bursts of up to one second's worth of requests
+            capacity = max(1.0, self.rate)
+            self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate, self._paused_until - now)
+            if deadline is not None and now + wait >= deadline:
+                return False
+            self._tokens -= 1.0
+        time.sleep(wait)
+        # A Retry-After that arrived while waiting holds this request too
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                pause = self._paused_until - now
+            if pause <= 0:
+                return True
+            if deadline is not None and now + pause >= deadline:
+                return False
+            time.sleep(pause)
+
+    def on_response(self, status_code, latency, retry_after=None):
+        with self._lock:
+            old_rate = self.rate
+            if status_code in THROTTLE_STATUS:
+                self.rate = max(self.min_rate, self.rate / 2)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            elif status_code is None or latency > RATE_LIMIT_TARGET_LATENCY:
+                # Slow responses and failed connections ease off a little
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            else:
+                self.rate = min(self.max_rate, self.rate + RATE_LIMIT_INCREASE)
+            if self.rate != old_rate and status_code in THROTTLE_STATUS:
+                logging.debug(f"{self.host} throttled ({status_code}), rate {old_rate:.2f} -> {self.rate:.2f} req/s")
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def set_rate_limit(host, rate, min_rate, max_rate):
+    # Starting, lowest and highest requests per second for a host, e.g. one
+    # a registered provider talks to. Applies to a host already in use too.
+    with _limiters_lock:
+        RATE_LIMITS[host] = (rate, min_rate, max_rate)
+        limiter = _limiters.get(host)
+        if limiter is not None:
+            limiter.min_rate, limiter.max_rate = min_rate, max_rate
+            limiter.rate = min(max(limiter.rate, min_rate), max_rate)
+
+def get_rate_limiter(url):
+    host = urlparse(url).hostname or url
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            rate, min_rate, max_rate = RATE_LIMITS.get(host, RATE_LIMIT_DEFAULT)
+            limiter = HostRateLimiter(host, rate, min_rate, max_rate)
+            _limiters[host] = limiter
+        return limiter
+
+def rate_limiter_stats():
+    # Current requests per second allowed for each host used so far
+    with _limiters_lock:
+        return {host: round(limiter.rate, 2) for host, limiter in _limiters.items()}
+
+def retry_after_seconds(response, default):
+    try:
+        return min(float(response.headers.get('Retry-After', default)), RATE_LIMIT_MAX_WAIT)
+    except ValueError:
+        # Retry-After can also be an HTTP date; fall back to the default wait
+        return default
+
+def out_of_time(deadline, wait):
+    # True when waiting wait seconds would leave no time before deadline
+    left = time_left(deadline)
+    return left is not None and wait >= left
+
+def limited_get(url, params=None, on_retry=None, timeout=HTTP_TIMEOUTS):
+    # GET over the shared session, paced by the host's rate limiter.
+    # Throttled responses (429/503) are retried up to RATE_LIMIT_MAX_RETRIES
+    # times after their Retry-After; connection errors, timeouts and
+    # 500/502/504 up to HTTP_MAX_RETRIES times with jittered exponential
+    # backoff. on_retry(seconds) is called before each retry. The last
+    # response is returned, or the last connection error raised.
+    # Inside call_with_deadline, timeouts are cut to the time left and no
+    # retry or rate limiter wait goes past the deadline.
+    limiter = get_rate_limiter(url)
+    session = get_session()
+    deadline = current_deadline()
+    throttled = 0
+    failed = 0
+    while True:
+        if not limiter.acquire(deadline):
+            raise requests.exceptions.Timeout(f"No time left for a request to {limiter.host}")
+        left = time_left(deadline)
+        request_timeout = timeout if left is None else tuple(min(part, max(left, 0.1)) for part in timeout)
+        start = time.monotonic()
+        try:
+            response = session.get(url, params=params, timeout=request_timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            limiter.on_response(None, time.monotonic() - start)
+            delay = backoff_delay(failed)
+            if failed == HTTP_MAX_RETRIES or out_of_time(deadline, delay):
+                raise
+            failed += 1
+            logging.debug(f"Request to {limiter.host} failed ({e}), retrying in {delay:.1f} second(s)")
+            if on_retry is not None:
+                on_retry(round(delay, 1))
+            time.sleep(delay)
+            continue
+        latency = time.monotonic() - start
+
+        if response.status_code in THROTTLE_STATUS:
+            retry_after = retry_after_seconds(response, 1.5)
+            limiter.on_response(response.status_code, latency, retry_after)
+            if throttled == RATE_LIMIT_MAX_RETRIES or out_of_time(deadline, retry_after):
+                return response
+            throttled += 1
+            logging.debug(f"{limiter.host} returned {response.status_code}, retrying in {retry_after} second(s)")
+            if on_retry is not None:
+                on_retry(retry_after)
+            continue
+
+        limiter.on_response(response.status_code, latency)
+        delay = backoff_delay(failed)
+        retry = failed < HTTP_MAX_RETRIES and not out_of_time(deadline, delay)
+        if response.status_code in SERVER_ERROR_STATUS and retry:
+            failed += 1
+            logging.debug(f"{limiter.host} returned {response.status_code}, retrying in {delay:.1f} second(s)")
+            if on_retry is not None:
+                on_retry(round(delay, 1))
+            time.sleep(delay)
+            continue
+        return response
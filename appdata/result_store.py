@@ -0,0 +1,148 @@
+import math
+import threading
+from array import array
+from collections.abc import Mapping
+
+from generate_google_maps_link import generate_google_maps_link
+from providers import result_fields
+
+# Stands in for a missing UTM value (None) in the integer columns
+MISSING_INT = -(2 ** 62)
+
+class CategoryColumn:
+    def __init__(self):
+        self.codes = array('i')
+        self.values = []
+        self._index = {}
+
+    def append(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._index[value] = code
+        self.codes.append(code)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+# Results kept column by column instead of one dict per row: coordinates and
+# elevation as float64, UTM as int64, the repeated names dictionary encoded
+# and free text (labels, "text" provider fields) as plain lists. The Google Maps link is rebuilt from the coordinates when read.
+# Rows are read back through ResultRow views, which look like the result
+# dicts from build_result without copying anything. The columns are those of
+# the registered providers (providers.result_fields) when the store is made.
+class ResultStore:
+    def __init__(self, fields=None):
+        self.fields = tuple(fields or result_fields())
+        self.keys = tuple(field.key for field in self.fields)
+        self.missing = {field.key: field.missing for field in self.fields}
+        self._lock = threading.Lock()
+        self.clear()
+
+    def columns(self, kind):
+        return tuple(field.key for field in self.fields if field.kind == kind)
+
+    def clear(self):
+        with self._lock:
+            self.labels = []
+            self.floats = {key: array('d') for key in self.columns("float")}
+            self.ints = {key: array('q') for key in self.columns("int")}
+            self.categories = {key: CategoryColumn() for key in self.columns("category")}
+            self.texts = {key: [] for key in self.columns("text") if key != "label"}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def append(self, result):
+        # Adds a build_result dict and returns its row number
+        with self._lock:
+            for key, column in self.floats.items():
+                value = result.get(key)
+                try:
+                    column.append(float(value))
+                except (TypeError, ValueError):
+                    column.append(math.nan)  # 'N/A'
+            for key, column in self.ints.items():
+                value = result.get(key)
+                column.append(MISSING_INT if value in (None, 'N/A', '') else int(value))
+            for key, column in self.categories.items():
+                column.append(result.get(key, self.missing[key]))
+            for key, column in self.texts.items():
+                column.append(result.get(key, self.missing[key]))
+            # The label goes last: len() counts labels, so readers on other
+            # threads never see a row whose columns are not all filled in
+            self.labels.append(result.get("label", ""))
+            return len(self.labels) - 1
+
+    def get(self, row, key):
+        if key == "label":
+            return self.labels[row]
+        if key in self.floats:
+            value = self.floats[key][row]
+            return self.missing[key] if math.isnan(value) else value
+        if key in self.ints:
+            value = self.ints[key][row]
+            return self.missing[key] if value == MISSING_INT else value
+        if key in self.categories:
+            return self.categories[key][row]
+        if key in self.texts:
+            return self.texts[key][row]
+        if key == "google_maps":
+            return generate_google_maps_link(self.floats["latitude"][row], self.floats["longitude"][row])
+        raise KeyError(key)
+
+    def row(self, row):
+        return ResultRow(self, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield ResultRow(self, row)
+
+    def values(self, row, keys=None):
+        return tuple(self.get(row, key) for key in keys or self.keys)
+
+    def to_dataframe(self):
+        # Typed pandas copy for columnar exports: float64, nullable Int64,
+        # categorical and string columns
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            data = {"label": pd.Series(self.labels, dtype="string")}
+            for key, column in self.floats.items():
+                data[key] = np.array(column, dtype=np.float64)
+            for key in self.ints:
+                values = np.array(self.ints[key], dtype=np.int64)
+                missing = values == MISSING_INT
+                data[key] = pd.arrays.IntegerArray(np.where(missing, 0, values), missing)
+            for key, column in self.categories.items():
+                # Values that are the same once turned into text share a category
+                positions = {}
+                remap = np.array(
+                    [positions.setdefault('N/A' if value is None else str(value), len(positions))
+                     for value in column.values],
+                    dtype=np.int32
+                )
+                codes = remap[np.array(column.codes, dtype=np.int32)] if len(column.codes) else np.array([], dtype=np.int32)
+                data[key] = pd.Categorical.from_codes(codes, categories=list(positions))
+            for key, column in self.texts.items():
+                data[key] = pd.Series([None if value is None else str(value) for value in column], dtype="string")
+        return pd.DataFrame(data, columns=[field.key for field in self.fields if field.kind != "link"])
+
+class ResultRow(Mapping):
+    # Read-only view of one stored row with the same keys as a result dict
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.store.get(self.index, key)
+
+    def __iter__(self):
+        return iter(self.store.keys)
+
+    def __len__(self):
+        return len(self.store.keys)
@@ -0,0 +1,121 @@
+import threading
+from tkinter import ttk, font
+
+# Virtual results table: the Treeview only ever holds the rows that fit on
+# screen, filled from the ResultStore, and the scrollbar is driven by the
+# store's row count. New rows can be added from any thread; the table is
+# redrawn at most once per GUI bridge frame, however many arrived.
+class ResultView:
+    def __init__(self, bridge, tree, scrollbar, store, columns=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.store = store
+        self.columns = columns or store.keys
+        self.first_row = 0  # rows before this were cleared from the view
+        self.top = 0        # first row shown, counted from first_row
+        self.visible = 1
+        self.follow = True  # keep the newest rows in sight as they arrive
+        self._drawn = None
+        self._lock = threading.Lock()
+        self._added = 0
+        self._latest = None
+
+        scrollbar.configure(command=self.on_scroll)
+        tree.bind("<Configure>", self.on_resize)
+        tree.bind("<MouseWheel>", self.on_wheel)
+        tree.bind("<Button-4>", self.on_wheel)
+        tree.bind("<Button-5>", self.on_wheel)
+        bridge.on_frame(self._tick)
+
+    def add(self, result, show=None):
+        # Stores a build_result dict and returns its row number. show(result,
+        # added) runs on the Tk thread at the next refresh, for the newest
+        # result only, with the number of rows added since the last refresh.
+        row = self.store.append(result)
+        with self._lock:
+            self._added += 1
+            self._latest = (result, show)
+        return row
+
+    def clear(self):
+        # Hides the rows stored so far; they stay in the store for exports
+        self.first_row = len(self.store)
+        self.top = 0
+        self.follow = True
+        self.refresh()
+
+    def row_count(self):
+        return len(self.store) - self.first_row
+
+    def row_values(self, row):
+        values = list(self.store.values(row, self.columns))
+        for i, key in enumerate(self.columns):
+            if key in ("latitude", "longitude"):
+                values[i] = round(values[i], 4) if values[i] is not None else "N/A"
+        return values
+
+    def refresh(self):
+        total = self.row_count()
+        if self.follow:
+            self.top = total - self.visible
+        self.top = max(0, min(self.top, total - self.visible))
+        end = min(total, self.top + self.visible)
+
+        # Stored rows never change, so the window only needs redrawing when
+        # it moves or grows
+        drawn = (self.first_row, self.top, end)
+        if drawn != self._drawn:
+            items = self.tree.get_children()
+            for i, row in enumerate(range(self.first_row + self.top, self.first_row + end)):
+                if i < len(items):
+                    self.tree.item(items[i], values=self.row_values(row))
+                else:
+                    self.tree.insert("", "end", iid=str(i), values=self.row_values(row))
+            if len(items) > end - self.top:
+                self.tree.delete(*items[end - self.top:])
+            self._drawn = drawn
+
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _tick(self):
+        with self._lock:
+            added, latest = self._added, self._latest
+            self._added, self._latest = 0, None
+        if latest is not None:
+            result, show = latest
+            if show is not None:
+                show(result, added)
+        self.refresh()
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, self.row_count() - self.visible))
+        self.follow = self.top + self.visible >= self.row_count()
+        self.refresh()
+
+    def on_scroll(self, action, amount, unit=None):
+        # Scrollbar commands: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_to(self.top + (-3 if up else 3))
+        return "break"
+
+    def on_resize(self, event):
+        # Rows that fit below the heading row
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = font.nametofont("TkDefaultFont").metrics("linespace") + 4
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.refresh()
@@ -0,0 +1,41 @@
+import threading
+import logging
+from concurrent.futures import Future
+
+# Coalesces concurrent calls for the same key: the first caller runs the
+# call, anyone asking for that key while it is running waits for and shares
+# its result (or exception). Nothing is kept once the call finishes; that is
+# the lookup cache's job.
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the running call
+        self.shared = 0
+
+    def do(self, key, call):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.shared += 1
+
+        if not leader:
+            logging.debug(f"Waiting for in-flight lookup {key}")
+            return future.result()
+
+        try:
+            value = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+single_flight = SingleFlight()
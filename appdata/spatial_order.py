@@ -0,0 +1,59 @@
+import numpy as np
+
+from lookup_settings import SPATIAL_ORDER_BITS, SPATIAL_ORDER_CELL
+
+# Space-filling curve keys for putting nearby points next to each other.
+# Points processed in this order hit the same cached answers, polygons and
+# provider tiles one after another instead of jumping around the map.
+
+SPATIAL_ORDER_METHODS = ("none", "hilbert", "zorder", "grid")
+
+def grid_coordinates(lats, lons, bits=SPATIAL_ORDER_BITS):
+    # Lat/lon scaled onto a 2**bits x 2**bits integer grid
+    n = 1 << bits
+    x = np.floor((np.asarray(lons, dtype=float) + 180.0) / 360.0 * n).astype(np.int64)
+    y = np.floor((np.asarray(lats, dtype=float) + 90.0) / 180.0 * n).astype(np.int64)
+    return np.clip(x, 0, n - 1), np.clip(y, 0, n - 1)
+
+def hilbert_keys(lats, lons, bits=SPATIAL_ORDER_BITS):
+    # Distance along the Hilbert curve, the classic xy -> d walk done for
+    # every point at once
+    x, y = grid_coordinates(lats, lons, bits)
+    n = 1 << bits
+    d = np.zeros_like(x)
+    s = n >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return d
+
+def zorder_keys(lats, lons, bits=SPATIAL_ORDER_BITS):
+    # Morton code: the bits of x and y interleaved
+    x, y = grid_coordinates(lats, lons, bits)
+    d = np.zeros_like(x)
+    for bit in range(bits):
+        d |= ((x >> bit) & 1) << (2 * bit)
+        d |= ((y >> bit) & 1) << (2 * bit + 1)
+    return d
+
+def grid_keys(lats, lons, cell=SPATIAL_ORDER_CELL):
+    # Row-major index of the cell x cell degree grid square
+    columns = int(np.ceil(360.0 / cell))
+    cell_x = np.floor((np.asarray(lons, dtype=float) + 180.0) / cell).astype(np.int64)
+    cell_y = np.floor((np.asarray(lats, dtype=float) + 90.0) / cell).astype(np.int64)
+    return cell_y * columns + cell_x
+
+def spatial_order(lats, lons, method="hilbert"):
+    # Indexes that put the points in spatial order. The sort is stable, so
+    # points with the same key keep their input order.
+    if method == "none":
+        return np.arange(len(lats))
+    keys = {"hilbert": hilbert_keys, "zorder": zorder_keys, "grid": grid_keys}[method](lats, lons)
+    return np.argsort(keys, kind="stable")
@@ -1,3 +1,16 @@
+import logging
+
+from gui_bridge import get_gui_bridge
+
 def update_status(message, status_var, root):
-    status_var.set(message)
-    root.update_idletasks()
\ No newline at end of file
+    # Safe from any thread: with the GUI running the message is shown at the
+    # next frame, and only the newest one if several arrive in between
+    bridge = get_gui_bridge()
+    if bridge is None:
+        status_var.set(message)
+    else:
+        bridge.set_var(status_var, message)
+
+def log_status(message, status_var=None, root=None):
+    # Drop-in for update_status when there is no GUI
+    logging.debug(message)
@@ -0,0 +1,106 @@
+import re
+import numpy as np
+import utm
+
+# Whole-array lat/lon <-> UTM conversion. Points are grouped by zone and
+# hemisphere and each group goes through the utm package in one numpy call.
+# Nothing here shows dialogs; bad rows come back flagged in a `valid` mask
+# with NaN coordinates and zone 0.
+
+# Latitude band letters from 80S to 84N, 8 degrees each (X covers 72-84N)
+ZONE_LETTERS = "CDEFGHJKLMNPQRSTUVWXX"
+
+def parse_utm_zone(text):
+    # "12", "12T" or "56H" -> (12, True). Letters are latitude bands as on
+    # MGRS grids: C-M are south of the equator, N-X north. A bare number is
+    # taken as northern.
+    match = re.fullmatch(r"\s*(\d{1,2})\s*([C-HJ-NP-Xc-hj-np-x]?)\s*", str(text))
+    if not match or not 1 <= int(match.group(1)) <= 60:
+        raise ValueError(f"invalid UTM zone: {text!r}")
+    letter = match.group(2).upper()
+    return int(match.group(1)), (letter >= "N") if letter else True
+
+def group_rows(groups, valid):
+    # (group, row indexes) for each distinct group among the valid rows,
+    # from one sort instead of a full-array comparison per group
+    rows = np.flatnonzero(valid)
+    rows = rows[np.argsort(groups[rows], kind="stable")]
+    sorted_groups = groups[rows]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    ends = np.r_[starts[1:], len(rows)]
+    return [(sorted_groups[start], rows[start:end]) for start, end in zip(starts, ends)]
+
+def zone_numbers(lats, lons):
+    zones = np.floor((lons + 180.0) / 6.0).astype(np.int64) + 1
+    zones = np.minimum(zones, 60)  # lon == 180
+    # Southwest Norway
+    zones[(lats >= 56) & (lats < 64) & (lons >= 3) & (lons < 12)] = 32
+    # Svalbard
+    svalbard = (lats >= 72) & (lons >= 0)
+    zones[svalbard & (lons < 9)] = 31
+    zones[svalbard & (lons >= 9) & (lons < 21)] = 33
+    zones[svalbard & (lons >= 21) & (lons < 33)] = 35
+    zones[svalbard & (lons >= 33) & (lons < 42)] = 37
+    return zones
+
+def zone_letters(lats):
+    index = np.clip(((lats + 80.0) // 8).astype(np.int64), 0, len(ZONE_LETTERS) - 1)
+    return np.array(list(ZONE_LETTERS))[index]
+
+def latlon_to_utm_batch(lats, lons):
+    # Returns (zones, letters, eastings, northings, valid) arrays
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    valid = (lats >= -80) & (lats <= 84) & (lons >= -180) & (lons <= 180)  # False for NaN too
+
+    zones = np.zeros(lats.shape, dtype=np.int64)
+    letters = np.full(lats.shape, "", dtype="<U1")
+    eastings = np.full(lats.shape, np.nan)
+    northings = np.full(lats.shape, np.nan)
+    if not valid.any():
+        return zones, letters, eastings, northings, valid
+
+    zones[valid] = zone_numbers(lats[valid], lons[valid])
+    letters[valid] = zone_letters(lats[valid])
+    groups = zones * 2 + (lats >= 0)
+    for group, rows in group_rows(groups, valid):
+        eastings[rows], northings[rows], _, _ = utm.from_latlon(
+            lats[rows], lons[rows], force_zone_number=int(group // 2), force_northern=bool(group % 2)
+        )
+    return zones, letters, eastings, northings, valid
+
+def utm_to_latlon_batch(zones, eastings, northings, northern=True):
+    # northern is one bool or a bool array per row. Returns (lats, lons, valid).
+    zones = np.asarray(zones)
+    eastings = np.asarray(eastings, dtype=float)
+    northings = np.asarray(northings, dtype=float)
+    northern = np.broadcast_to(np.asarray(northern, dtype=bool), eastings.shape)
+    zones = np.where(np.isfinite(zones.astype(float)), zones, 0).astype(np.int64)
+
+    # Same bounds the utm package enforces in strict mode
+    valid = (
+        (zones >= 1) & (zones <= 60)
+        & (eastings >= 100_000) & (eastings < 1_000_000)
+        & (northings >= 0) & (northings <= 10_000_000)
+    )
+    lats = np.full(eastings.shape, np.nan)
+    lons = np.full(eastings.shape, np.nan)
+    groups = zones * 2 + northern
+    for group, rows in group_rows(groups, valid):
+        lats[rows], lons[rows] = utm.to_latlon(
+            eastings[rows], northings[rows], int(group // 2), northern=bool(group % 2), strict=False
+        )
+    return lats, lons, valid
+
+def utm_for_points(points):
+    # (zone, easting, northing) for each (lat, lon), rounded the same way as
+    # convert_latlon_utm, for build_result. Invalid points get Nones.
+    points = list(points)
+    if not points:
+        return []
+    lats, lons = np.round(np.array(points, dtype=float).reshape(-1, 2), 4).T
+    zones, _, eastings, northings, valid = latlon_to_utm_batch(lats, lons)
+    return [
+        (int(zone), round(float(easting)), round(float(northing))) if ok else (None, None, None)
+        for zone, easting, northing, ok in zip(zones, eastings, northings, valid)
+    ]
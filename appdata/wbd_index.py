@@ -0,0 +1,93 @@
+import os
+import threading
+import logging
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shapely import STRtree
+
+from get_watershed_info import layers, parent_huc_names, watershed_results
+from huc_names import add_huc_names, load_huc_names
+from lookup_settings import WBD_DIR
+
+# Offline watershed lookups against WBD HUC12 polygons exported to GeoParquet.
+# One HUC12 hit resolves all six levels: the parents are code prefixes of the
+# HUC12 and are named from the HUC name table.
+class WbdIndex:
+    def __init__(self, wbd_dir=WBD_DIR):
+        huc12_path = os.path.join(wbd_dir, "huc12.parquet")
+        logging.debug(f"Loading WBD HUC12 polygons from {huc12_path}...")
+        huc12 = gpd.read_parquet(huc12_path, columns=['huc12', 'name', 'geometry'])
+        if huc12.crs is not None and huc12.crs.to_epsg() != 4326:
+            huc12 = huc12.to_crs(4326)
+        self.huc12 = huc12.reset_index(drop=True)
+        self.codes = self.huc12['huc12'].to_numpy(dtype=object)
+        self.names = self.huc12['name'].to_numpy(dtype=object)
+        self.tree = STRtree(self.huc12.geometry.values)
+
+        # Parent layers are optional and only read for their names
+        missing = []
+        for _, name, _, code_field, _ in layers[:-1]:
+            path = os.path.join(wbd_dir, f"{name.lower()}.parquet")
+            if os.path.exists(path):
+                parents = pd.read_parquet(path, columns=[code_field, 'name'])
+                add_huc_names(dict(zip(parents[code_field], parents['name'])))
+            else:
+                missing.append(f"{name.lower()}.parquet")
+        if missing:
+            logging.warning(f"{', '.join(missing)} not found in {wbd_dir}: those parent watershed names "
+                            "are 'Unknown' unless the HUC name tables already have them")
+        add_huc_names(dict(zip(self.codes, self.names)))
+        logging.debug(f"WBD index ready: {len(self.huc12)} HUC12 polygons")
+
+    def lookup_many(self, lats, lons):
+        points = shapely.points(np.asarray(lons, dtype=np.float64), np.asarray(lats, dtype=np.float64))
+        hits = np.full(len(points), -1, dtype=np.int64)
+        point_idx, poly_idx = self.tree.query(points, predicate='intersects')
+        first = np.unique(point_idx, return_index=True)[1]
+        hits[point_idx[first]] = poly_idx[first]
+
+        results = []
+        for hit in hits:
+            if hit < 0:
+                results.append(watershed_results('Unknown', None, {}))
+            else:
+                code = self.codes[hit]
+                results.append(watershed_results(code, self.names[hit], parent_huc_names(code)))
+        return results
+
+    def lookup(self, lat, lon):
+        return self.lookup_many([lat], [lon])[0]
+
+    def classify(self, df, lat_col="Lat", lon_col="Lon"):
+        # Bulk path: classify a whole DataFrame of points with one spatial join.
+        # Returns a copy of df with the watershed result columns added.
+        # The join runs on row positions, so a df index with duplicates
+        # still gives one result per row; df's own index is kept on the output
+        points = gpd.GeoDataFrame(
+            geometry=gpd.points_from_xy(df[lon_col].to_numpy(), df[lat_col].to_numpy()),
+            crs=4326
+        )
+        joined = gpd.sjoin(points, self.huc12[['huc12', 'name', 'geometry']], how='left', predicate='intersects')
+        # A point on a shared boundary joins more than once, keep the first match
+        joined = joined[~joined.index.duplicated(keep='first')].reindex(points.index)
+
+        codes = joined['huc12']
+        names = load_huc_names()
+        out = df.copy()
+        for _, _, key, _, length in layers[:-1]:
+            out[key] = codes.str[:length].map(names).fillna('Unknown').to_numpy()
+        out["Catchment"] = joined['name'].fillna('Unknown').to_numpy()
+        out["HUC12 Code"] = codes.fillna('Unknown').to_numpy()
+        return out
+
+_wbd_index = None
+_wbd_index_lock = threading.Lock()
+
+def load_wbd_index():
+    global _wbd_index
+    with _wbd_index_lock:
+        if _wbd_index is None:
+            _wbd_index = WbdIndex()
+        return _wbd_index
@@ -0,0 +1,39 @@
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "appdata"))
+
+import lookup_cache
+import rate_limiter
+from async_engine import enrich_each
+
+class InstantResponse:
+    status_code = 200
+    headers = {}
+
+    def json(self):
+        return {"State": {"name": "Colorado"}, "County": {"name": "Boulder"}}
+
+    def raise_for_status(self):
+        pass
+
+class InstantSession:
+    def get(self, url, params=None, timeout=None):
+        return InstantResponse()
+
+def test_rate_limited_provider_has_no_failures_against_a_healthy_server(monkeypatch):
+    # Hundreds of points queue for geo.fcc.gov's rate limiter at once; with a
+    # server that answers instantly, none of them may time out waiting
+    monkeypatch.setattr(lookup_cache, "_lookup_cache", None)
+    monkeypatch.setattr(lookup_cache, "_lookup_cache_enabled", False)
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.setattr(rate_limiter, "get_session", lambda: InstantSession())
+
+    results = []
+    points = ((f"Point {i}", 40 + i * 0.001, -105.0) for i in range(300))
+    written = asyncio.run(enrich_each(points, results.append, providers=("state_county",)))
+
+    assert written == 300
+    assert [result["label"] for result in results] == [f"Point {i}" for i in range(300)]
+    assert [result for result in results if result["state"] != "Colorado"] == []